@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("akademk", "0002_group_is_active"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                fields=["group", "status"], name="enrollments_group_status_idx"
+            ),
+        ),
+    ]
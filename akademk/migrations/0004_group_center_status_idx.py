@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-18 08:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("akademk", "0003_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="group",
+            index=models.Index(
+                fields=["center", "status"], name="groups_center_status_idx"
+            ),
+        ),
+    ]
@@ -50,6 +50,9 @@ class Group(models.Model):
         db_table = "groups"
         verbose_name = _("Group")
         verbose_name_plural = _("Groups")
+        indexes = [
+            models.Index(fields=["center", "status"], name="groups_center_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.course.name}"
@@ -130,6 +133,9 @@ class Enrollment(models.Model):
         verbose_name = _("Enrollment")
         verbose_name_plural = _("Enrollments")
         unique_together = [["student", "group"]]
+        indexes = [
+            models.Index(fields=["group", "status"], name="enrollments_group_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student.user.name} - {self.group.name}"
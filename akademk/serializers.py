@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Course, Group, Schedule, Student, Enrollment
 from hisoblar.serializers import UserSerializer
+from moliya.serializers import StudentBalanceSerializer
 
 
 class CourseSerializer(serializers.ModelSerializer):
@@ -59,10 +60,19 @@ class GroupSerializer(serializers.ModelSerializer):
 class StudentSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     user_id = serializers.IntegerField(write_only=True)
+    balance = StudentBalanceSerializer(read_only=True)
 
     class Meta:
         model = Student
-        fields = ["id", "user", "user_id", "parent_name", "parent_phone", "created_at"]
+        fields = [
+            "id",
+            "user",
+            "user_id",
+            "parent_name",
+            "parent_phone",
+            "balance",
+            "created_at",
+        ]
         read_only_fields = ["id", "created_at"]
 
 
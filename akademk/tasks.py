@@ -1,11 +1,14 @@
 from celery import shared_task
+from django.db.models import Count, F, Q
 from django.utils import timezone
 from datetime import timedelta
+from notification.fanout import fan_out
+from notification.ledger import only_new
 from notification.models import Notification, SMSNotification, EmailNotification
 from akademk.models import Group, Enrollment, Student, Schedule
 from ishtirok.models import Homework, HomeworkSubmission, Attendance
 from yadro.models import Center
-from moliya.models import Payment, Debt
+from moliya.revenue import revenue_report
 
 
 # ----------------- Class reminder -----------------
@@ -23,26 +26,31 @@ def send_class_reminder(group_id, hours_before=2):
     if not schedules.exists():
         return "No classes today"
 
-    enrollments = Enrollment.objects.filter(group=group, status="active")
-    for enrollment in enrollments:
-        for schedule in schedules:
-            # Notification
-            Notification.objects.create(
-                user=enrollment.student.user,
-                title="Dars eslatmasi",
-                message=f"{hours_before} soatdan keyin {group.name} darsi boshlanadi. Vaqti: {schedule.start_time.strftime('%H:%M')}",
-                type="info",
-                link=f"/groups/{group.id}",
-            )
-            # SMS
-            if enrollment.student.user.phone:
-                SMSNotification.objects.create(
-                    phone=enrollment.student.user.phone,
-                    message=f"Eslatma: {hours_before} soatdan keyin {group.name} darsi. Vaqt: {schedule.start_time.strftime('%H:%M')}",
-                    status="pending",
-                )
-
-    return f"Reminders sent to {enrollments.count()} students"
+    recipients = Enrollment.objects.filter(group=group, status="active").values(
+        subject_id=F("id"),
+        user_id=F("student__user_id"),
+        phone=F("student__user__phone"),
+    )
+    count = 0
+    for schedule in schedules:
+        # Beat har minut ishlaydi - har bir dars uchun bir marta
+        counts = fan_out(
+            only_new(recipients, "class_reminder", f"{today}:{schedule.id}"),
+            title="Dars eslatmasi",
+            message="{hours} soatdan keyin {group} darsi boshlanadi. Vaqti: {time}",
+            sms="Eslatma: {hours} soatdan keyin {group} darsi. Vaqt: {time}",
+            type="info",
+            link=f"/groups/{group.id}",
+            digest=True,
+            context={
+                "hours": hours_before,
+                "group": group.name,
+                "time": schedule.start_time.strftime("%H:%M"),
+            },
+        )
+        count += counts["notifications"]
+
+    return f"Reminders sent to {count} students"
 
 
 # ----------------- Homework reminder -----------------
@@ -60,82 +68,127 @@ def send_homework_deadline_reminder(homework_id):
     ).values_list("student_id", flat=True)
     not_submitted = enrollments.exclude(student_id__in=submitted_students)
 
-    for enrollment in not_submitted:
-        Notification.objects.create(
-            user=enrollment.student.user,
-            title="Vazifa eslatmasi",
-            message=f"'{homework.title}' vazifasi muddati {homework.due_date.strftime('%d.%m.%Y')} kuni tugaydi!",
-            type="warning",
-            link=f"/homeworks/{homework.id}",
-        )
-        if enrollment.student.user.phone:
-            SMSNotification.objects.create(
-                phone=enrollment.student.user.phone,
-                message=f"Vazifa '{homework.title}' muddati {homework.due_date.strftime('%d.%m.%Y')} tugaydi. Topshirishni unutmang!",
-                status="pending",
-            )
+    counts = fan_out(
+        not_submitted.values(
+            user_id=F("student__user_id"), phone=F("student__user__phone")
+        ),
+        title="Vazifa eslatmasi",
+        message="'{title}' vazifasi muddati {due_date} kuni tugaydi!",
+        sms="Vazifa '{title}' muddati {due_date} tugaydi. Topshirishni unutmang!",
+        type="warning",
+        link=f"/homeworks/{homework.id}",
+        digest=True,
+        context={
+            "title": homework.title,
+            "due_date": homework.due_date.strftime("%d.%m.%Y"),
+        },
+    )
 
-    return f"Reminders sent to {not_submitted.count()} students"
+    return f"Reminders sent to {counts['notifications']} students"
 
 
 # ----------------- Low attendance -----------------
+LOW_ATTENDANCE_THRESHOLD = 70
+BULK_CHUNK_SIZE = 1000
+
+
 @shared_task
 def check_low_attendance():
     thirty_days_ago = timezone.now() - timedelta(days=30)
-    enrollments = Enrollment.objects.filter(status="active")
+    in_window = Q(
+        student__student_payments__group_id=F("group_id"),
+        student__student_payments__lesson_date__gte=thirty_days_ago,
+    )
 
-    for enrollment in enrollments:
-        attendances = Attendance.objects.filter(
-            student=enrollment.student,
-            group=enrollment.group,
-            lesson_date__gte=thirty_days_ago,
+    # Bitta so'rov: har bir faol enrollment uchun 30 kunlik davomat foizi,
+    # faqat chegaradan past bo'lganlari qaytadi
+    offenders = (
+        Enrollment.objects.filter(status="active")
+        .annotate(
+            total=Count("student__student_payments", filter=in_window),
+            attended=Count(
+                "student__student_payments",
+                filter=in_window & Q(student__student_payments__status="present"),
+            ),
+        )
+        .filter(total__gt=0)
+        .alias(attended_pct=F("attended") * 100)
+        .filter(attended_pct__lt=F("total") * LOW_ATTENDANCE_THRESHOLD)
+        .values(
+            "id",
+            "student__user_id",
+            "student__user__name",
+            "student__parent_phone",
+            "group__name",
+            "total",
+            "attended",
         )
-        total_classes = attendances.count()
-        if total_classes == 0:
-            continue
-        attended = attendances.filter(status="present").count()
-        attendance_rate = (attended / total_classes) * 100
-        if attendance_rate < 70:
-            Notification.objects.create(
-                user=enrollment.student.user,
-                title="Past davomat!",
-                message=f"{enrollment.group.name} guruhida davomatingiz {attendance_rate:.1f}%. Iltimos darsga muntazam qatnang!",
-                type="error",
-                link="/attendance",
-            )
-            if getattr(enrollment.student, "parent_phone", None):
-                SMSNotification.objects.create(
-                    phone=enrollment.student.parent_phone,
-                    message=f"DIQQAT! {enrollment.student.user.name}ning {enrollment.group.name} guruhida davomat {attendance_rate:.1f}% ga tushdi.",
-                    status="pending",
-                )
-    return "Low attendance check completed"
+    )
+
+    def recipients():
+        for row in offenders.iterator(chunk_size=BULK_CHUNK_SIZE):
+            yield {
+                "subject_id": row["id"],
+                "user_id": row["student__user_id"],
+                "phone": row["student__parent_phone"],
+                "name": row["student__user__name"],
+                "group": row["group__name"],
+                "rate": (row["attended"] / row["total"]) * 100,
+            }
+
+    # Har bir enrollment haftasiga bir martadan ko'p ogohlantirilmaydi
+    year, week, _ = timezone.localdate().isocalendar()
+    counts = fan_out(
+        only_new(
+            recipients(),
+            "low_attendance",
+            f"{year}-W{week:02d}",
+            chunk_size=BULK_CHUNK_SIZE,
+        ),
+        title="Past davomat!",
+        message="{group} guruhida davomatingiz {rate:.1f}%. Iltimos darsga muntazam qatnang!",
+        sms="DIQQAT! {name}ning {group} guruhida davomat {rate:.1f}% ga tushdi.",
+        type="error",
+        link="/attendance",
+        digest=True,
+        chunk_size=BULK_CHUNK_SIZE,
+    )
+    return f"Low attendance check completed: {counts['notifications']} enrollments below {LOW_ATTENDANCE_THRESHOLD}%"
 
 
 # ----------------- Monthly report -----------------
+def _report_period(today, period):
+    """Joriy oy, chorak yoki yilning boshlanish sanasi va nomi"""
+    if period == "quarter":
+        quarter = (today.month - 1) // 3 + 1
+        return (
+            today.replace(month=3 * quarter - 2, day=1),
+            f"{today.year} yil {quarter}-chorak",
+        )
+    if period == "year":
+        return today.replace(month=1, day=1), f"{today.year} yil"
+    return today.replace(day=1), f"{today.strftime('%B')} oyi"
+
+
 @shared_task
-def generate_monthly_report(center_id):
+def generate_monthly_report(center_id, period="month"):
     try:
         center = Center.objects.get(id=center_id)
     except Center.DoesNotExist:
         return f"Center {center_id} not found"
 
-    today = timezone.now()
-    month_start = today.replace(day=1)
+    today = timezone.localdate()
+    period_start, period_name = _report_period(today, period)
     total_students = Student.objects.filter(user__center=center).count()
-    monthly_payments = Payment.objects.filter(
-        student__user__center=center,
-        created_at__gte=month_start,
-        status="completed",
-    )
-    total_revenue = sum(p.amount for p in monthly_payments)
+    # Kunlik rollup'dan - to'lovlar jadvali skanerlanmaydi
+    report = revenue_report(center.id, period_start, today)
 
     directors = center.users.filter(role="director")
     for director in directors:
         Notification.objects.create(
             user=director,
             title="Oylik hisobot tayyor",
-            message=f"{today.strftime('%B')} oyi uchun hisobot tayyor. Umumiy daromad: {total_revenue:,.0f} so'm",
+            message=f"{period_name} uchun hisobot tayyor. Umumiy daromad: {report['total_revenue']:,.0f} so'm",
             type="success",
             link="/reports",
         )
@@ -1,5 +1,6 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
+from django.db.models import Prefetch
 from rest_framework.decorators import action
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.response import Response
@@ -39,7 +40,13 @@ class CourseViewSet(viewsets.ModelViewSet):
 
 
 class GroupViewSet(viewsets.ModelViewSet):
-    queryset = Group.objects.all().order_by("id")
+    queryset = (
+        Group.objects.select_related("course", "teacher", "branch")
+        .prefetch_related(
+            Prefetch("schedules", queryset=Schedule.objects.select_related("room"))
+        )
+        .order_by("id")
+    )
     serializer_class = GroupSerializer
     permission_classes = [IsAuthenticated, IsManager]
 
@@ -51,10 +58,10 @@ class GroupViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Group.objects.all()
+            return self.queryset.all()
         elif user.role == "teacher":
-            return Group.objects.filter(teacher=user)
-        return Group.objects.filter(center=user.center)
+            return self.queryset.filter(teacher=user)
+        return self.queryset.filter(center=user.center)
 
     def perform_create(self, serializer):
         if self.request.user.role != "superadmin":
@@ -65,13 +72,15 @@ class GroupViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"])
     def students(self, request, pk=None):
         group = self.get_object()
-        enrollments = Enrollment.objects.filter(group=group, status="active")
+        enrollments = Enrollment.objects.filter(
+            group=group, status="active"
+        ).select_related("student__user", "group__course")
         serializer = EnrollmentSerializer(enrollments, many=True)
         return Response(serializer.data)
 
 
 class ScheduleViewSet(viewsets.ModelViewSet):
-    queryset = Schedule.objects.all()
+    queryset = Schedule.objects.select_related("room")
     serializer_class = ScheduleSerializer
     permission_classes = [IsAuthenticated, IsManager]
     filterset_fields = ["group", "day_of_week"]
@@ -79,16 +88,28 @@ class ScheduleViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Schedule.objects.all()
+            return self.queryset.all()
         elif user.role == "teacher":
-            return Schedule.objects.filter(group__teacher=user)
-        return Schedule.objects.filter(group__center=user.center)
+            return self.queryset.filter(group__teacher=user)
+        return self.queryset.filter(group__center=user.center)
 
 
 class StudentViewSet(viewsets.ModelViewSet):
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related("user__center", "user__branch", "balance")
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated, IsManager]
+    # Masalan qarzdorlar: ?balance__balance__lt=0&ordering=balance__balance
+    filterset_fields = {
+        "balance__balance": ["lt", "lte", "gt", "gte"],
+        "balance__open_debt": ["gt", "gte"],
+    }
+    ordering_fields = [
+        "id",
+        "created_at",
+        "balance__balance",
+        "balance__open_debt",
+        "balance__total_paid",
+    ]
     search_fields = [
         "user__name",
         "user__email",
@@ -100,19 +121,21 @@ class StudentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Student.objects.all()
-        return Student.objects.filter(user__center=user.center)
+            return self.queryset.all()
+        return self.queryset.filter(user__center=user.center)
 
     @action(detail=True, methods=["get"])
     def enrollments(self, request, pk=None):
         student = self.get_object()
-        enrollments = Enrollment.objects.filter(student=student)
+        enrollments = Enrollment.objects.filter(student=student).select_related(
+            "student__user", "group__course"
+        )
         serializer = EnrollmentSerializer(enrollments, many=True)
         return Response(serializer.data)
 
 
 class EnrollmentViewSet(viewsets.ModelViewSet):
-    queryset = Enrollment.objects.all()
+    queryset = Enrollment.objects.select_related("student__user", "group__course")
     serializer_class = EnrollmentSerializer
     permission_classes = [IsAuthenticated, IsManager]
     filterset_fields = ["student", "group", "status"]
@@ -120,5 +143,5 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Enrollment.objects.all()
-        return Enrollment.objects.filter(group__center=user.center)
+            return self.queryset.all()
+        return self.queryset.filter(group__center=user.center)
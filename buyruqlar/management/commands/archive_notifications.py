@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notification.retention import ARCHIVE_BATCH_SIZE, CHANNELS, archive_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Move sent/read notifications older than the retention window into "
+        "monthly gzip archives and keep daily delivery stats"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--channel",
+            choices=sorted(CHANNELS),
+            action="append",
+            help="Only archive this channel (can be repeated)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Override NOTIFICATION_RETENTION_DAYS for the selected channels",
+        )
+        parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument("--archive-dir", help="Override NOTIFICATION_ARCHIVE_DIR")
+
+    def handle(self, *args, **options):
+        retention = dict(settings.NOTIFICATION_RETENTION_DAYS)
+        if options["channel"]:
+            retention = {channel: retention[channel] for channel in options["channel"]}
+        if options["days"] is not None:
+            retention = {channel: options["days"] for channel in retention}
+
+        totals = archive_notifications(
+            retention, options["batch_size"], options["archive_dir"]
+        )
+        for channel, result in totals.items():
+            self.stdout.write(
+                f"{channel}: {result['archived']} rows archived "
+                f"in {result['batches']} batches"
+            )
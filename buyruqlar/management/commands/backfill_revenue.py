@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from moliya.revenue import backfill
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the RevenueDaily rollup from paid payments for the given "
+        "date range (whole history by default)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+        parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+        parser.add_argument("--center", type=int, help="Only rebuild this center")
+
+    def handle(self, *args, **options):
+        dates = {}
+        for name in ["date_from", "date_to"]:
+            value = options[name]
+            dates[name] = parse_date(value) if value else None
+            if value and dates[name] is None:
+                raise CommandError(f"{value!r} is not a YYYY-MM-DD date")
+
+        rows = backfill(center_id=options["center"], **dates)
+        self.stdout.write(f"{rows} daily revenue rows written")
@@ -0,0 +1,202 @@
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from akademk.models import Enrollment, Group
+from hisoblar.models import User
+from ishtirok.models import Attendance
+from moliya.models import Debt, Payment
+from notification.models import (
+    EmailNotification,
+    Notification,
+    PushNotification,
+    SMSNotification,
+)
+from potential.models import Lead
+from yadro.models import ActivityLog
+
+PROJECT_APPS = {
+    "akademk",
+    "hisoblar",
+    "ishtirok",
+    "moliya",
+    "notification",
+    "potential",
+    "yadro",
+}
+
+
+def _first(model, field="pk", **filters):
+    return (
+        model.objects.filter(**filters)
+        .order_by("pk")
+        .values_list(field, flat=True)
+        .first()
+    ) or 0
+
+
+def hot_queries():
+    """get_queryset, filterset va beat vazifalaridagi eng ko'p ishlatiladigan filtrlar"""
+    today = timezone.localdate()
+    now = timezone.now()
+    center_id = _first(Payment, "center_id")
+    group_id = _first(Attendance, "group_id")
+    student_id = _first(Attendance, "student_id", group_id=group_id)
+    user_id = _first(Notification, "user_id")
+
+    return [
+        (
+            "payments: center statistics",
+            Payment.objects.filter(
+                center_id=center_id,
+                status="paid",
+                created_at__gte=now - timedelta(days=30),
+            ),
+        ),
+        (
+            "attendance: group by day",
+            Attendance.objects.filter(
+                group_id=group_id, lesson_date__gte=today - timedelta(days=30)
+            ),
+        ),
+        (
+            "attendance: low attendance window",
+            Attendance.objects.filter(
+                student_id=student_id,
+                group_id=group_id,
+                lesson_date__gte=today - timedelta(days=30),
+            ),
+        ),
+        (
+            "debts: overdue",
+            Debt.objects.filter(status="open", due_date__lt=today),
+        ),
+        # check_low_attendance faol enrollmentlarning deyarli hammasini o'qiydi -
+        # u yerda to'liq scan kutilgan, shuning uchun ro'yxatga kiritilmagan
+        (
+            "enrollments: active in group",
+            Enrollment.objects.filter(group_id=group_id, status="active"),
+        ),
+        (
+            "groups: center by status",
+            Group.objects.filter(center_id=center_id, status="active"),
+        ),
+        (
+            "users: center by role",
+            User.objects.filter(center_id=center_id, role="director"),
+        ),
+        (
+            "leads: center by status",
+            Lead.objects.filter(center_id=center_id, status="new"),
+        ),
+        (
+            "notifications: unread inbox",
+            Notification.objects.filter(user_id=user_id, is_read=False),
+        ),
+        (
+            "sms: pending outbox",
+            SMSNotification.objects.filter(status="pending").order_by("created_at"),
+        ),
+        (
+            "sms: failed since",
+            SMSNotification.objects.filter(
+                status="failed", created_at__gte=now - timedelta(days=1)
+            ),
+        ),
+        (
+            "emails: pending outbox",
+            EmailNotification.objects.filter(status="pending").order_by("created_at"),
+        ),
+        (
+            "push: pending outbox",
+            PushNotification.objects.filter(status="pending").order_by("created_at"),
+        ),
+        (
+            "activity logs: by target",
+            ActivityLog.objects.filter(target_table="leads", target_id=1),
+        ),
+    ]
+
+
+def full_scans(plan, table):
+    """Reja ichida jadvalni indekssiz to'liq o'qish bormi"""
+    if connection.vendor == "postgresql":
+        return bool(re.search(rf"Seq Scan on {table}\b", plan))
+    # SQLite: "SCAN payments" - indekssiz, "SCAN payments USING INDEX" - indeks bilan
+    return any(
+        re.search(rf"\bSCAN {table}\b", line) and "USING" not in line
+        for line in plan.splitlines()
+    )
+
+
+def declared_indexes():
+    """Loyiha modellaridagi Meta.indexes: {nom: (jadval, model label)}"""
+    indexes = {}
+    for model in apps.get_models():
+        if model._meta.app_label not in PROJECT_APPS:
+            continue
+        for index in model._meta.indexes:
+            indexes[index.name] = (model._meta.db_table, model._meta.label)
+    return indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on hot tenant-scoped queries and report full table scans "
+        "(missing indexes) and declared indexes no plan uses"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Refresh planner statistics (ANALYZE) before explaining",
+        )
+        parser.add_argument(
+            "--verbose-plans", action="store_true", help="Print every query plan"
+        )
+        parser.add_argument(
+            "--fail-on-missing",
+            action="store_true",
+            help="Exit with an error if any hot query scans a whole table",
+        )
+
+    def handle(self, *args, **options):
+        if options["analyze"]:
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        indexes = declared_indexes()
+        used = set()
+        missing = []
+
+        for label, queryset in hot_queries():
+            plan = queryset.explain()
+            table = queryset.model._meta.db_table
+            used.update(name for name in indexes if re.search(rf"\b{name}\b", plan))
+
+            if full_scans(plan, table):
+                missing.append(label)
+                self.stdout.write(self.style.WARNING(f"SCAN   {label}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"INDEX  {label}"))
+            if options["verbose_plans"]:
+                for line in plan.splitlines():
+                    self.stdout.write(f"         {line}")
+
+        unused = sorted(set(indexes) - used)
+        self.stdout.write("")
+        self.stdout.write(f"Hot queries with full scans: {len(missing)}")
+        for label in missing:
+            self.stdout.write(f"  - {label}")
+        self.stdout.write(f"Declared indexes not used by any plan: {len(unused)}")
+        for name in unused:
+            table, model = indexes[name]
+            self.stdout.write(f"  - {name} on {table} ({model})")
+
+        if missing and options["fail_on_missing"]:
+            raise CommandError(f"{len(missing)} hot queries scan whole tables")
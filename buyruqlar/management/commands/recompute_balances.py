@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from moliya.balance import RECONCILE_CHUNK_SIZE, reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute StudentBalance rows from payments and debts and fix any "
+        "drift from the incrementally maintained values"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--student",
+            type=int,
+            action="append",
+            help="Only recompute this student id (can be repeated)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        totals = reconcile(options["student"], options["chunk_size"])
+        self.stdout.write(
+            f"{totals['checked']} balances checked, {totals['created']} created, "
+            f"{totals['fixed']} fixed"
+        )
@@ -0,0 +1,650 @@
+import math
+import random
+import time as timer
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from akademk.models import Course, Group, Schedule, Student, Enrollment
+from hisoblar.models import User, Role
+from ishtirok.models import Attendance, Homework, HomeworkSubmission, Score
+from moliya.balance import reconcile as reconcile_balances
+from moliya.revenue import backfill as backfill_revenue
+from moliya.models import Payment, Debt
+from notification.models import (
+    Notification,
+    SMSNotification,
+    EmailNotification,
+    PushNotification,
+)
+from potential.models import Lead
+from yadro.models import Center, Branch, Room, ActivityLog
+from yadro.stats import recount
+
+FIRST_NAMES = [
+    "Ali",
+    "Aziz",
+    "Bekzod",
+    "Dilnoza",
+    "Doston",
+    "Gulnora",
+    "Jasur",
+    "Kamola",
+    "Laylo",
+    "Malika",
+    "Nodir",
+    "Otabek",
+    "Sardor",
+    "Sevara",
+    "Shahzod",
+    "Umid",
+    "Zarina",
+    "Olga",
+    "Timur",
+    "Madina",
+]
+LAST_NAMES = [
+    "Valiyev",
+    "Karimov",
+    "Rashidov",
+    "Yusupov",
+    "Tursunov",
+    "Aliyev",
+    "Ergashev",
+    "Qodirov",
+    "Saidov",
+    "Nazarov",
+    "Xolmatov",
+    "Petrov",
+]
+BRANCH_NAMES = [
+    "Chilonzor",
+    "Yunusobod",
+    "Mirzo Ulug'bek",
+    "Sergeli",
+    "Yakkasaroy",
+    "Olmazor",
+]
+COURSES = [
+    ("Python Programming", "PY", 800000),
+    ("Web Development", "WEB", 1000000),
+    ("Mobile Development", "MOB", 1100000),
+    ("Graphic Design", "GD", 700000),
+    ("English B1", "ENG", 500000),
+    ("IELTS", "IELTS", 900000),
+    ("Mathematics", "MATH", 400000),
+    ("Russian", "RUS", 450000),
+]
+LEAD_SOURCES = ["instagram", "telegram", "referral", "website", "walk-in"]
+DAY_PATTERNS = [(0, 2, 4), (1, 3, 5)]
+SLOTS = [time(9), time(11), time(14), time(16), time(18)]
+PASSWORDS = {
+    "director": "director123",
+    "manager": "manager123",
+    "teacher": "teacher123",
+    "student": "student123",
+}
+GROUP_SIZE = 15
+
+
+@contextmanager
+def historical_timestamps(*models):
+    """created_at/updated_at ni qo'lda berish uchun auto_now'ni vaqtincha o'chirish"""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class BulkWriter:
+    """Obyektlarni yig'ib, har chunk_size tadan bulk_create qiladi"""
+
+    def __init__(self, model, chunk_size):
+        self.model = model
+        self.chunk_size = chunk_size
+        self.rows = []
+        self.count = 0
+
+    def add(self, obj):
+        self.rows.append(obj)
+        if len(self.rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.model.objects.bulk_create(self.rows, batch_size=self.chunk_size)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+class Command(BaseCommand):
+    help = "Seed database with deterministic, production-sized sample data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--centers", type=int, default=1)
+        parser.add_argument("--students-per-center", type=int, default=50)
+        parser.add_argument("--months", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.seed = options["seed"]
+        self.chunk_size = options["chunk_size"]
+        self.students_per_center = options["students_per_center"]
+        self.today = timezone.localdate()
+        self.window_start = self.today - timedelta(days=30 * options["months"])
+        self.months = options["months"]
+
+        if Center.objects.filter(domain=self.domain(1)).exists():
+            raise CommandError(
+                f"Seed {self.seed} is already loaded, use another --seed value"
+            )
+
+        self.stdout.write("Seeding database...")
+        started = timer.monotonic()
+
+        # Parollar faqat bir marta hash qilinadi
+        self.hashes = {role: make_password(pw) for role, pw in PASSWORDS.items()}
+
+        for role, _ in User.ROLE_CHOICES:
+            Role.objects.get_or_create(name=role)
+
+        if not User.objects.filter(email="admin_panel@mambacrm.uz").exists():
+            User.objects.create_superuser(
+                email="admin_panel@mambacrm.uz", password="admin123", name="Super Admin"
+            )
+
+        self.writers = {
+            model: BulkWriter(model, self.chunk_size)
+            for model in [
+                Attendance,
+                HomeworkSubmission,
+                Score,
+                Payment,
+                Debt,
+                Lead,
+                ActivityLog,
+                Notification,
+                SMSNotification,
+                EmailNotification,
+                PushNotification,
+            ]
+        }
+
+        with historical_timestamps(*self.writers, Homework):
+            for number in range(1, options["centers"] + 1):
+                with transaction.atomic():
+                    center = self.seed_center(number)
+                    for writer in self.writers.values():
+                        writer.flush()
+                    recount(center.id)
+                    reconcile_balances(center.students.values("id"))
+                    backfill_revenue(center_id=center.id)
+                self.stdout.write(self.style.SUCCESS(f"Created center: {center.name}"))
+
+        for model, writer in self.writers.items():
+            self.stdout.write(
+                self.style.SUCCESS(f"Created {writer.count} {model.__name__} rows")
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Database seeded successfully in {timer.monotonic() - started:.1f}s!"
+            )
+        )
+        self.stdout.write(self.style.WARNING(" credentials: "))
+        self.stdout.write(
+            self.style.WARNING("Superadmin: admin_panel@mambacrm.uz / admin123")
+        )
+        for role in ["director", "manager", "teacher", "student"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{role.title()}: {role}1@{self.domain(1)} / {PASSWORDS[role]}"
+                )
+            )
+
+    # ----------------- Helpers -----------------
+    def domain(self, number):
+        return f"center{number}.seed{self.seed}.uz"
+
+    def name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def phone(self):
+        return f"+99890{self.rng.randint(1000000, 9999999)}"
+
+    def moment(self, day, start=time(8), end=time(20)):
+        seconds = self.rng.randint(start.hour * 3600, end.hour * 3600 + end.minute * 60)
+        return timezone.make_aware(
+            datetime.combine(day, time()) + timedelta(seconds=seconds)
+        )
+
+    def random_day(self, start=None):
+        start = start or self.window_start
+        span = max((self.today - start).days, 0)
+        return start + timedelta(days=self.rng.randint(0, span))
+
+    def users(self, center, role, count, branches):
+        domain = center.domain
+        return User.objects.bulk_create(
+            [
+                User(
+                    center=center,
+                    branch=self.rng.choice(branches),
+                    role=role,
+                    name=self.name(),
+                    email=f"{role}{i}@{domain}",
+                    phone=self.phone(),
+                    password=self.hashes[role],
+                )
+                for i in range(1, count + 1)
+            ],
+            batch_size=self.chunk_size,
+        )
+
+    # ----------------- Center -----------------
+    def seed_center(self, number):
+        rng = self.rng
+        center = Center.objects.create(
+            name=f"Academy {number}",
+            domain=self.domain(number),
+            plan=rng.choice(["free", "basic", "premium"]),
+            status="active",
+        )
+
+        branches = Branch.objects.bulk_create(
+            [
+                Branch(
+                    center=center,
+                    name=branch_name,
+                    address=f"{branch_name}, Tashkent",
+                    phone=self.phone(),
+                )
+                for branch_name in rng.sample(BRANCH_NAMES, rng.randint(1, 4))
+            ]
+        )
+        rooms = Room.objects.bulk_create(
+            [
+                Room(
+                    center=center,
+                    branch=branch,
+                    name=f"Room {i}0{j}",
+                    capacity=rng.choice([12, 15, 20, 25]),
+                )
+                for i, branch in enumerate(branches, start=1)
+                for j in range(1, 4)
+            ]
+        )
+        rooms_by_branch = {}
+        for room in rooms:
+            rooms_by_branch.setdefault(room.branch_id, []).append(room)
+
+        group_count = max(1, math.ceil(self.students_per_center * 1.3 / GROUP_SIZE))
+        self.users(center, "director", 1, branches)
+        managers = self.users(center, "manager", len(branches), branches)
+        teachers = self.users(center, "teacher", max(2, group_count // 4), branches)
+
+        courses = Course.objects.bulk_create(
+            [
+                Course(
+                    center=center,
+                    name=course_name,
+                    description=f"{course_name} course",
+                    price=price,
+                )
+                for course_name, _, price in rng.sample(COURSES, rng.randint(3, 6))
+            ]
+        )
+        short_names = {course_name: short for course_name, short, _ in COURSES}
+
+        groups = []
+        for i in range(1, group_count + 1):
+            course = rng.choice(courses)
+            start_date = self.window_start - timedelta(days=rng.randint(0, 60))
+            finished = rng.random() < 0.1
+            groups.append(
+                Group(
+                    center=center,
+                    branch=rng.choice(branches),
+                    course=course,
+                    teacher=rng.choice(teachers),
+                    name=f"{short_names[course.name]}-{i:03d}",
+                    start_date=start_date,
+                    end_date=(
+                        self.random_day()
+                        if finished
+                        else start_date + timedelta(days=270)
+                    ),
+                    status="finished" if finished else "active",
+                    is_active=not finished,
+                )
+            )
+        groups = Group.objects.bulk_create(groups)
+
+        lesson_days = {}
+        schedules = []
+        for group in groups:
+            pattern = rng.choice(DAY_PATTERNS)
+            slot = rng.choice(SLOTS)
+            lesson_days[group.id] = (pattern, slot)
+            for day in pattern:
+                schedules.append(
+                    Schedule(
+                        group=group,
+                        day_of_week=day,
+                        start_time=slot,
+                        end_time=time(slot.hour + 2),
+                        room=rng.choice(rooms_by_branch[group.branch_id]),
+                    )
+                )
+        Schedule.objects.bulk_create(schedules)
+
+        student_users = self.users(
+            center, "student", self.students_per_center, branches
+        )
+        students = Student.objects.bulk_create(
+            [
+                Student(
+                    center=center,
+                    user=user,
+                    parent_name=self.name(),
+                    parent_phone=self.phone(),
+                )
+                for user in student_users
+            ],
+            batch_size=self.chunk_size,
+        )
+
+        enrollments = []
+        for i, student in enumerate(students):
+            first = groups[i % len(groups)]
+            picked = [first]
+            if len(groups) > 1 and rng.random() < 0.3:
+                picked.append(rng.choice([g for g in groups if g is not first]))
+            for group in picked:
+                enrollments.append(
+                    Enrollment(
+                        student=student,
+                        group=group,
+                        start_date=group.start_date,
+                        status="active" if group.status == "active" else "finished",
+                    )
+                )
+        enrollments = Enrollment.objects.bulk_create(
+            enrollments, batch_size=self.chunk_size
+        )
+
+        self.seed_attendance(groups, enrollments, lesson_days)
+        self.seed_homeworks(groups, enrollments)
+        self.seed_finance(center, groups, enrollments, courses)
+        self.seed_leads(center, managers)
+        self.seed_notifications(student_users)
+        return center
+
+    # ----------------- Attendance -----------------
+    def seed_attendance(self, groups, enrollments, lesson_days):
+        rng = self.rng
+        groups_by_id = {group.id: group for group in groups}
+        by_group = {}
+        for enrollment in enrollments:
+            by_group.setdefault(enrollment.group_id, []).append(enrollment)
+
+        writer = self.writers[Attendance]
+        for group_id, group_enrollments in by_group.items():
+            group = groups_by_id[group_id]
+            pattern, slot = lesson_days[group_id]
+            day = max(group.start_date, self.window_start)
+            last_day = min(group.end_date or self.today, self.today)
+            # Har bir o'quvchining o'z "qatnashish ehtimoli" bor
+            propensity = {
+                e.student_id: rng.uniform(0.55, 0.98) for e in group_enrollments
+            }
+            while day <= last_day:
+                if day.weekday() in pattern:
+                    marked_at = timezone.make_aware(datetime.combine(day, slot))
+                    for enrollment in group_enrollments:
+                        roll = rng.random()
+                        if roll < propensity[enrollment.student_id]:
+                            att_status = "present"
+                        elif roll < propensity[enrollment.student_id] + 0.05:
+                            att_status = "late"
+                        else:
+                            att_status = "absent"
+                        writer.add(
+                            Attendance(
+                                group_id=group_id,
+                                student_id=enrollment.student_id,
+                                lesson_date=day,
+                                status=att_status,
+                                marked_by_id=group.teacher_id,
+                                created_at=marked_at,
+                            )
+                        )
+                day += timedelta(days=1)
+
+    # ----------------- Homeworks & scores -----------------
+    def seed_homeworks(self, groups, enrollments):
+        rng = self.rng
+        homeworks = []
+        for group in groups:
+            day = max(group.start_date, self.window_start)
+            while day <= self.today:
+                homeworks.append(
+                    Homework(
+                        group=group,
+                        title=f"{group.name} vazifa {len(homeworks) + 1}",
+                        description="Mavzu bo'yicha mashqlar",
+                        due_date=day + timedelta(days=7),
+                        created_by_id=group.teacher_id,
+                        created_at=self.moment(day),
+                    )
+                )
+                day += timedelta(days=14)
+        homeworks = Homework.objects.bulk_create(homeworks, batch_size=self.chunk_size)
+
+        by_group = {}
+        for enrollment in enrollments:
+            by_group.setdefault(enrollment.group_id, []).append(enrollment)
+        teachers = {group.id: group.teacher_id for group in groups}
+
+        submissions = self.writers[HomeworkSubmission]
+        scores = self.writers[Score]
+        for homework in homeworks:
+            for enrollment in by_group.get(homework.group_id, []):
+                if rng.random() > 0.7:
+                    continue
+                reviewed = homework.due_date < self.today and rng.random() < 0.8
+                submitted = self.moment(min(homework.due_date, self.today))
+                submissions.add(
+                    HomeworkSubmission(
+                        homework=homework,
+                        student_id=enrollment.student_id,
+                        status="reviewed" if reviewed else "submitted",
+                        grade=rng.randint(50, 100) if reviewed else None,
+                        feedback="Yaxshi" if reviewed else "",
+                        submitted_at=submitted,
+                        reviewed_at=submitted + timedelta(days=1) if reviewed else None,
+                    )
+                )
+                if reviewed:
+                    scores.add(
+                        Score(
+                            student_id=enrollment.student_id,
+                            group_id=homework.group_id,
+                            score=rng.randint(50, 100),
+                            comment=homework.title,
+                            created_by_id=teachers[homework.group_id],
+                            created_at=submitted,
+                        )
+                    )
+
+    # ----------------- Payments & debts -----------------
+    def seed_finance(self, center, groups, enrollments, courses):
+        rng = self.rng
+        prices = {course.id: course.price for course in courses}
+        groups_by_id = {group.id: group for group in groups}
+        payments = self.writers[Payment]
+        debts = self.writers[Debt]
+        methods = ["cash", "click", "payme", "bank_transfer"]
+
+        for enrollment in enrollments:
+            group = groups_by_id[enrollment.group_id]
+            price = prices[group.course_id]
+            for month in range(self.months):
+                due_date = self.window_start + timedelta(days=30 * month + 5)
+                if due_date > self.today:
+                    break
+                paid_at = self.moment(
+                    min(due_date + timedelta(days=rng.randint(-5, 5)), self.today)
+                )
+                roll = rng.random()
+                if roll < 0.82:
+                    payment_status = "paid"
+                elif roll < 0.87:
+                    payment_status = "failed"
+                elif roll < 0.88:
+                    payment_status = "refunded"
+                else:
+                    payment_status = "pending"
+
+                payments.add(
+                    Payment(
+                        center=center,
+                        student_id=enrollment.student_id,
+                        branch_id=enrollment.student.user.branch_id,
+                        amount=price,
+                        method=rng.choices(methods, weights=[4, 3, 3, 1])[0],
+                        status=payment_status,
+                        transaction_id=(
+                            f"{self.seed}-{enrollment.id}-{month}"
+                            if payment_status != "pending"
+                            else ""
+                        ),
+                        description=f"{group.name} - {month + 1}-oy",
+                        created_at=paid_at,
+                        updated_at=paid_at,
+                    )
+                )
+                if payment_status != "paid" or rng.random() < 0.1:
+                    created = self.moment(due_date - timedelta(days=10))
+                    debts.add(
+                        Debt(
+                            student_id=enrollment.student_id,
+                            amount=(
+                                price
+                                if payment_status != "paid"
+                                else Decimal(price) / 2
+                            ),
+                            due_date=due_date,
+                            status="closed" if payment_status == "paid" else "open",
+                            description=f"{group.name} - {month + 1}-oy",
+                            created_at=created,
+                            updated_at=created,
+                        )
+                    )
+
+    # ----------------- Leads -----------------
+    def seed_leads(self, center, managers):
+        rng = self.rng
+        writer = self.writers[Lead]
+        logs = self.writers[ActivityLog]
+        for i in range(max(1, self.students_per_center // 5)):
+            created = self.moment(self.random_day())
+            logs.add(
+                ActivityLog(
+                    user=rng.choice(managers),
+                    action="lead_created",
+                    target_table="leads",
+                    target_id=i + 1,
+                    details={"source": "seed"},
+                    created_at=created,
+                )
+            )
+            writer.add(
+                Lead(
+                    center=center,
+                    name=self.name(),
+                    phone=self.phone(),
+                    email=f"lead{i}@{center.domain}" if rng.random() < 0.4 else "",
+                    source=rng.choice(LEAD_SOURCES),
+                    status=rng.choices(
+                        ["new", "contacted", "converted", "lost"],
+                        weights=[3, 3, 2, 2],
+                    )[0],
+                    assigned_to=rng.choice(managers),
+                    created_at=created,
+                    updated_at=created,
+                )
+            )
+
+    # ----------------- Notifications -----------------
+    def seed_notifications(self, users):
+        rng = self.rng
+        notifications = self.writers[Notification]
+        sms = self.writers[SMSNotification]
+        emails = self.writers[EmailNotification]
+        pushes = self.writers[PushNotification]
+        for user in users:
+            for _ in range(rng.randint(0, self.months * 2)):
+                created = self.moment(self.random_day())
+                notifications.add(
+                    Notification(
+                        user=user,
+                        title=rng.choice(
+                            ["Dars eslatmasi", "To'lov eslatmasi", "Vazifa eslatmasi"]
+                        ),
+                        message="Eslatma",
+                        type=rng.choice(["info", "warning", "success", "error"]),
+                        is_read=rng.random() < 0.7,
+                        created_at=created,
+                    )
+                )
+                if rng.random() < 0.5:
+                    sent = rng.random() < 0.95
+                    sms.add(
+                        SMSNotification(
+                            phone=user.phone,
+                            message="Eslatma",
+                            status="sent" if sent else "failed",
+                            error_message="" if sent else "Provider error",
+                            created_at=created,
+                            sent_at=created if sent else None,
+                        )
+                    )
+                if rng.random() < 0.3:
+                    emails.add(
+                        EmailNotification(
+                            to_email=user.email,
+                            subject="Eslatma",
+                            body="Eslatma",
+                            status="sent",
+                            created_at=created,
+                            sent_at=created,
+                        )
+                    )
+                if rng.random() < 0.3:
+                    pushes.add(
+                        PushNotification(
+                            user=user,
+                            title="Eslatma",
+                            body="Eslatma",
+                            status="sent",
+                            created_at=created,
+                            sent_at=created,
+                        )
+                    )
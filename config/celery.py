@@ -24,6 +24,10 @@ app.conf.beat_schedule = {
         "task": "notification.tasks.send_pending_emails",
         "schedule": 60.0,
     },
+    "send-pending-push-every-minute": {
+        "task": "notification.tasks.send_pending_push",
+        "schedule": 60.0,
+    },
     "check-low-attendance-every-minute": {
         "task": "akademk.tasks.check_low_attendance",
         "schedule": crontab(),
@@ -36,6 +40,22 @@ app.conf.beat_schedule = {
         "task": "akademk.tasks.send_class_reminder",
         "schedule": crontab(),
     },
+    "reconcile-center-stats-nightly": {
+        "task": "yadro.tasks.reconcile_center_stats",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "reconcile-student-balances-nightly": {
+        "task": "moliya.tasks.reconcile_student_balances",
+        "schedule": crontab(hour=3, minute=15),
+    },
+    "backfill-recent-revenue-nightly": {
+        "task": "moliya.tasks.backfill_recent_revenue",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "archive-notifications-nightly": {
+        "task": "notification.tasks.archive_old_notifications",
+        "schedule": crontab(hour=2, minute=30),
+    },
 }
 
 app.conf.timezone = "Asia/Tashkent"
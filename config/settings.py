@@ -1,5 +1,6 @@
 from pathlib import Path
 from datetime import timedelta
+from tempfile import gettempdir
 from decouple import config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -197,6 +198,30 @@ CELERY_TIMEZONE = "Asia/Tashkent"
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
 
+# Kesh barcha web va Celery jarayonlari uchun umumiy bo'lishi shart: statistika
+# versiyasi va o'qilmaganlar soni boshqa jarayonda eskirtiriladi. Redis URL
+# berilmasa bitta serverdagi barcha jarayonlar uchun umumiy fayl kesh
+CACHE_REDIS_URL = config("CACHE_REDIS_URL", default="")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": config(
+                "CACHE_DIR", default=str(Path(gettempdir()) / "mambacrm-cache")
+            ),
+        }
+    }
+
+# Testlar o'z vaqtinchalik kesh katalogidan foydalanadi
+TEST_RUNNER = "man_test.runner.TestRunner"
+
 SESSION_COOKIE_SAMESITE = "None"
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SAMESITE = "None"
@@ -212,3 +237,46 @@ EMAIL_HOST_PASSWORD = "zxcvbnm123*"
 # settings.py
 # settings.py
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+
+# SMS provayderlar
+ESKIZ_API_URL = config("ESKIZ_API_URL", default="https://notify.eskiz.uz/api")
+ESKIZ_API_TOKEN = config("ESKIZ_API_TOKEN", default="")
+ESKIZ_SENDER = config("ESKIZ_SENDER", default="4546")
+SMS_BATCH_SIZE = 200  # bitta batch so'rovdagi xabarlar soni
+SMS_HTTP_TIMEOUT = (3.05, 15)  # (ulanish, javob) soniyalarda
+# Provayder kvotalari: rate - soniyasiga xabar, burst - bir martalik zaxira
+SMS_RATE_LIMITS = {
+    "eskiz": {"rate": 50, "burst": 200},
+}
+# Token bucket barcha workerlar uchun umumiy bo'lishi uchun Redis'da saqlanadi
+SMS_RATE_LIMIT_REDIS_URL = config("SMS_RATE_LIMIT_REDIS_URL", default=CELERY_BROKER_URL)
+
+# Click to'lov tizimi: callback imzosi (sign_string) shu kalit bilan tekshiriladi.
+# Bo'sh bo'lsa barcha callback'lar rad etiladi
+CLICK_SECRET_KEY = config("CLICK_SECRET_KEY", default="")
+
+# Real vaqtdagi bildirishnomalar (SSE). Bo'sh bo'lsa jarayon ichidagi pub/sub,
+# bir nechta ASGI/Celery worker uchun Redis URL berilishi kerak
+NOTIFICATION_STREAM_REDIS_URL = config("NOTIFICATION_STREAM_REDIS_URL", default="")
+
+# Digest: eslatma tasklarining SMS/email'lari qabul qiluvchi bo'yicha shuncha
+# soniya ushlanib, bitta xabarga birlashtiriladi (0 - o'chirilgan)
+NOTIFICATION_DIGEST_WINDOW = config("NOTIFICATION_DIGEST_WINDOW", default=300, cast=int)
+SMS_DIGEST_MAX_LENGTH = 459  # 3 ta GSM-7 segment (3 x 153 belgi)
+
+# Yangi qurilma tokenlari uchun push provayderi (notification.push.PROVIDERS).
+# Bo'sh bo'lsa push'lar "failed" bo'ladi; "fake" faqat lokal ishlab chiqish uchun
+PUSH_PROVIDER = config("PUSH_PROVIDER", default="")
+
+# Retention: shuncha kundan eski yuborilgan/o'qilgan bildirishnomalar oylik
+# gzip arxivga ko'chiriladi, jadvalda faqat kunlik statistika qoladi
+NOTIFICATION_RETENTION_DAYS = {
+    "notification": 90,
+    "email": 30,
+    "sms": 30,
+    "push": 30,
+}
+NOTIFICATION_ARCHIVE_DIR = config(
+    "NOTIFICATION_ARCHIVE_DIR", default=str(BASE_DIR / "archive")
+)
+
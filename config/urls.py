@@ -23,10 +23,13 @@ from ishtirok.viewa import (
 )
 from moliya.viewa import PaymentViewSet, DebtViewSet
 from notification.views import (
+    DeviceTokenViewSet,
+    InboxViewSet,
     EmailNotificationViewSet,
     SMSNotificationViewSet,
     PushNotificationViewSet,
     NotificationViewSet,
+    notification_stream,
 )
 from potential.viewa import LeadViewSet
 from yadro.viewa import CenterViewSet, BranchViewSet, RoomViewSet, ActivityLogViewSet
@@ -54,6 +57,7 @@ router.register(r"enrollments", EnrollmentViewSet, basename="enrollment")
 
 # Notifications
 router.register(r"notifications", NotificationViewSet, basename="notification")
+router.register(r"inbox", InboxViewSet, basename="inbox")
 router.register(
     r"email-notifications", EmailNotificationViewSet, basename="emailnotification"
 )
@@ -63,6 +67,7 @@ router.register(
 router.register(
     r"push-notifications", PushNotificationViewSet, basename="pushnotification"
 )
+router.register(r"devices", DeviceTokenViewSet, basename="device")
 
 # Attendance & LMS
 router.register(r"attendance", AttendanceViewSet, basename="attendance")
@@ -85,6 +90,11 @@ router.register(r"leads", LeadViewSet, basename="lead")
 # URL patterns
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path(
+        "api/notifications/stream/",
+        notification_stream,
+        name="notification-stream",
+    ),
     path("api/", include(router.urls)),
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path(
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("hisoblar", "0003_user_created_at_user_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["center", "role"], name="users_center_role_idx"),
+        ),
+    ]
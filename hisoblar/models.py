@@ -84,6 +84,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         db_table = "users"
         verbose_name = _("User")
         verbose_name_plural = _("Users")
+        indexes = [
+            models.Index(fields=["center", "role"], name="users_center_role_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.role})"
@@ -85,7 +85,7 @@ class UserViewSet(viewsets.ModelViewSet):
     Userlarni ko'rish, yaratish, o'chirish va yangilash
     """
 
-    queryset = User.objects.all()
+    queryset = User.objects.select_related("center", "branch")
     permission_classes = [IsAuthenticated, IsManager]
     filterset_fields = ["role", "status", "center", "branch"]
     search_fields = ["name", "email", "phone"]
@@ -98,8 +98,8 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return User.objects.all()
-        return User.objects.filter(center=user.center)
+            return self.queryset.all()
+        return self.queryset.filter(center=user.center)
 
     def perform_create(self, serializer):
         if self.request.user.role != "superadmin":
@@ -113,6 +113,6 @@ class RoleViewSet(viewsets.ModelViewSet):
     Rolelarni ko'rish va boshqarish
     """
 
-    queryset = Role.objects.all()
+    queryset = Role.objects.prefetch_related("permissions")
     serializer_class = RoleSerializer
     permission_classes = [IsAuthenticated, IsSuperAdmin]
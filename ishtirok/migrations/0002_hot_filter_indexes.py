@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ishtirok", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["group", "lesson_date"], name="attendance_group_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["student", "group", "lesson_date"],
+                name="attendance_student_date_idx",
+            ),
+        ),
+    ]
@@ -30,6 +30,15 @@ class Attendance(models.Model):
         verbose_name = _("Attendance")
         verbose_name_plural = _("Attendances")
         unique_together = [["group", "student", "lesson_date"]]
+        indexes = [
+            models.Index(
+                fields=["group", "lesson_date"], name="attendance_group_date_idx"
+            ),
+            models.Index(
+                fields=["student", "group", "lesson_date"],
+                name="attendance_student_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student.user.name} - {self.lesson_date} - {self.status}"
@@ -14,6 +14,17 @@ class AttendanceSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'marked_by']
 
 
+class AttendanceMarkSerializer(serializers.Serializer):
+    student_id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES)
+
+
+class BulkAttendanceSerializer(serializers.Serializer):
+    group_id = serializers.IntegerField()
+    lesson_date = serializers.DateField()
+    attendances = AttendanceMarkSerializer(many=True, allow_empty=False)
+
+
 class HomeworkSerializer(serializers.ModelSerializer):
     group_name = serializers.CharField(source='group.name', read_only=True)
     created_by_name = serializers.CharField(source='created_by.name', read_only=True)
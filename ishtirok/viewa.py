@@ -1,13 +1,16 @@
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
-from akademk.models import Student, Group
-from hisoblar.models import User
-from moliya.models import Payment
-from yadro.models import Center
+from akademk.models import Enrollment
+from yadro.export import CSVExportMixin
+from yadro.models import Center, CenterStats
+from yadro.serializers import CenterStatsSerializer
+from yadro.stats import recount
 from .models import Attendance, Homework, HomeworkSubmission, Score
 from .serializers import (
     AttendanceSerializer,
+    BulkAttendanceSerializer,
     HomeworkSerializer,
     HomeworkSubmissionSerializer,
     ScoreSerializer,
@@ -16,67 +19,129 @@ from akademk.ruxsatnomalar import IsTeacher
 
 from rest_framework import viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Count, Q
+
+
+def _parse_date_param(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Date must be in YYYY-MM-DD format"})
+    return parsed
+
+
+class AttendanceCursorPagination(CursorPagination):
+    page_size = 100
+    ordering = ("-lesson_date", "-id")
 
 
 class CenterAnalyticsViewSet(viewsets.ViewSet):
 
+    def _center_attendances(self, request, pk):
+        date_from = _parse_date_param(request, "from")
+        date_to = _parse_date_param(request, "to")
+        attendances = Attendance.objects.filter(group__center_id=pk)
+        if date_from:
+            attendances = attendances.filter(lesson_date__gte=date_from)
+        if date_to:
+            attendances = attendances.filter(lesson_date__lte=date_to)
+        return attendances
+
     @action(detail=True, methods=["get"])
     def analytics(self, request, pk=None):
-        try:
-            center = Center.objects.get(id=pk)
-        except Center.DoesNotExist:
-            return Response({"detail": "Center not found"}, status=404)
-
-        # --- Summary ---
-        total_users = User.objects.filter(center=center).count()
-        total_students = Student.objects.filter(center=center).count()
-        total_groups = Group.objects.filter(center=center).count()
-        active_groups = Group.objects.filter(center=center, is_active=True).count()
-        total_revenue = (
-            Payment.objects.filter(center=center).aggregate(total=Sum("amount"))[
-                "total"
-            ]
-            or 0
-        )
-        branches_count = center.branches.count()
+        attendances = self._center_attendances(request, pk)
+        stats = CenterStats.objects.filter(pk=pk).first()
+        if stats is None:
+            if not Center.objects.filter(id=pk).exists():
+                return Response({"detail": "Center not found"}, status=404)
+            stats = recount(pk)
 
-        attendances = Attendance.objects.filter(group__center=center).select_related(
-            "student", "group"
+        # --- Davomat: guruh va kun bo'yicha bitta GROUP BY ---
+        rows = (
+            attendances.values("group_id", "group__name", "lesson_date")
+            .annotate(
+                present=Count("id", filter=Q(status="present")),
+                absent=Count("id", filter=Q(status="absent")),
+                late=Count("id", filter=Q(status="late")),
+            )
+            .order_by("lesson_date", "group_id")
         )
-        serializer = AttendanceSerializer(attendances, many=True)
+
+        by_group = {}
+        by_day = {}
+        for row in rows:
+            group = by_group.setdefault(
+                row["group_id"],
+                {
+                    "group": row["group_id"],
+                    "group_name": row["group__name"],
+                    "present": 0,
+                    "absent": 0,
+                    "late": 0,
+                },
+            )
+            day = by_day.setdefault(
+                row["lesson_date"],
+                {"date": row["lesson_date"], "present": 0, "absent": 0, "late": 0},
+            )
+            for key in ("present", "absent", "late"):
+                group[key] += row[key]
+                day[key] += row[key]
 
         data = {
-            "summary": {
-                "total_users": total_users,
-                "total_students": total_students,
-                "total_groups": total_groups,
-                "active_groups": active_groups,
-                "total_revenue": total_revenue,
-                "branches_count": branches_count,
+            "summary": CenterStatsSerializer(stats).data,
+            "attendance": {
+                "by_group": list(by_group.values()),
+                "by_day": list(by_day.values()),
             },
-            "attendances": serializer.data,
         }
 
         return Response(data)
 
+    @action(detail=True, methods=["get"])
+    def attendances(self, request, pk=None):
+        attendances = self._center_attendances(request, pk).select_related(
+            "student__user", "group", "marked_by"
+        )
+        paginator = AttendanceCursorPagination()
+        page = paginator.paginate_queryset(attendances, request, view=self)
+        serializer = AttendanceSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
 
-class AttendanceViewSet(viewsets.ModelViewSet):
-    queryset = Attendance.objects.all()
+class AttendanceViewSet(CSVExportMixin, viewsets.ModelViewSet):
+    queryset = Attendance.objects.select_related("student__user", "group", "marked_by")
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated, IsTeacher]
     filterset_fields = ["group", "student", "lesson_date", "status"]
+    export_filename = "attendance"
+    export_fields = [
+        ("Sana", "lesson_date"),
+        ("Guruh", "group__name"),
+        ("O'quvchi", "student__user__name"),
+        ("Status", "status"),
+        ("Belgilagan", "marked_by__name"),
+        ("Belgilangan vaqt", "created_at"),
+    ]
 
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Attendance.objects.all()
+            return self.queryset.all()
         elif user.role == "teacher":
-            return Attendance.objects.filter(group__teacher=user)
+            return self.queryset.filter(group__teacher=user)
         elif user.role == "student":
-            return Attendance.objects.filter(student__user=user)
-        return Attendance.objects.filter(group__center=user.center)
+            return self.queryset.filter(student__user=user)
+        return self.queryset.filter(group__center=user.center)
 
     def perform_create(self, serializer):
         serializer.save(marked_by=self.request.user)
@@ -84,26 +149,64 @@ class AttendanceViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["post"])
     def bulk_mark(self, request):
         """Bulk attendance marking for a lesson"""
-        group_id = request.data.get("group_id")
-        lesson_date = request.data.get("lesson_date")
-        attendances = request.data.get("attendances", [])
-
-        created = []
-        for item in attendances:
-            att, _ = Attendance.objects.update_or_create(
-                group_id=group_id,
-                student_id=item["student_id"],
-                lesson_date=lesson_date,
-                defaults={"status": item["status"], "marked_by": request.user},
+        serializer = BulkAttendanceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        group_id = serializer.validated_data["group_id"]
+        lesson_date = serializer.validated_data["lesson_date"]
+        # Bir o'quvchi ikki marta kelsa oxirgisi olinadi
+        marks = {
+            item["student_id"]: item["status"]
+            for item in serializer.validated_data["attendances"]
+        }
+
+        enrolled = set(
+            Enrollment.objects.filter(
+                group_id=group_id, student_id__in=marks, status="active"
+            ).values_list("student_id", flat=True)
+        )
+        not_enrolled = sorted(set(marks) - enrolled)
+        if not_enrolled:
+            return Response(
+                {
+                    "error": "Students are not enrolled in this group",
+                    "students": not_enrolled,
+                },
+                status=400,
             )
-            created.append(att)
 
-        serializer = self.get_serializer(created, many=True)
-        return Response(serializer.data)
+        with transaction.atomic():
+            Attendance.objects.bulk_create(
+                [
+                    Attendance(
+                        group_id=group_id,
+                        student_id=student_id,
+                        lesson_date=lesson_date,
+                        status=att_status,
+                        marked_by=request.user,
+                    )
+                    for student_id, att_status in marks.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["group", "student", "lesson_date"],
+                update_fields=["status", "marked_by"],
+            )
+
+        counts = {key: 0 for key, _ in Attendance.STATUS_CHOICES}
+        for att_status in marks.values():
+            counts[att_status] += 1
+
+        return Response(
+            {
+                "group_id": group_id,
+                "lesson_date": lesson_date,
+                "marked": len(marks),
+                "counts": counts,
+            }
+        )
 
 
 class HomeworkViewSet(viewsets.ModelViewSet):
-    queryset = Homework.objects.all()
+    queryset = Homework.objects.select_related("group", "created_by")
     serializer_class = HomeworkSerializer
     permission_classes = [IsAuthenticated, IsTeacher]
     filterset_fields = ["group"]
@@ -112,24 +215,24 @@ class HomeworkViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Homework.objects.all()
+            return self.queryset.all()
         elif user.role == "teacher":
-            return Homework.objects.filter(group__teacher=user)
+            return self.queryset.filter(group__teacher=user)
         elif user.role == "student":
             from akademk.models import Enrollment
 
             student_groups = Enrollment.objects.filter(
                 student__user=user, status="active"
             ).values_list("group_id", flat=True)
-            return Homework.objects.filter(group_id__in=student_groups)
-        return Homework.objects.filter(group__center=user.center)
+            return self.queryset.filter(group_id__in=student_groups)
+        return self.queryset.filter(group__center=user.center)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
 class HomeworkSubmissionViewSet(viewsets.ModelViewSet):
-    queryset = HomeworkSubmission.objects.all()
+    queryset = HomeworkSubmission.objects.select_related("student__user", "homework")
     serializer_class = HomeworkSubmissionSerializer
     permission_classes = [IsAuthenticated]
     filterset_fields = ["homework", "student", "status"]
@@ -137,12 +240,12 @@ class HomeworkSubmissionViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return HomeworkSubmission.objects.all()
+            return self.queryset.all()
         elif user.role == "teacher":
-            return HomeworkSubmission.objects.filter(homework__group__teacher=user)
+            return self.queryset.filter(homework__group__teacher=user)
         elif user.role == "student":
-            return HomeworkSubmission.objects.filter(student__user=user)
-        return HomeworkSubmission.objects.filter(homework__group__center=user.center)
+            return self.queryset.filter(student__user=user)
+        return self.queryset.filter(homework__group__center=user.center)
 
     @action(
         detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsTeacher]
@@ -163,7 +266,7 @@ class HomeworkSubmissionViewSet(viewsets.ModelViewSet):
 
 
 class ScoreViewSet(viewsets.ModelViewSet):
-    queryset = Score.objects.all()
+    queryset = Score.objects.select_related("student__user", "group", "created_by")
     serializer_class = ScoreSerializer
     permission_classes = [IsAuthenticated, IsTeacher]
     filterset_fields = ["student", "group"]
@@ -171,12 +274,12 @@ class ScoreViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Score.objects.all()
+            return self.queryset.all()
         elif user.role == "teacher":
-            return Score.objects.filter(group__teacher=user)
+            return self.queryset.filter(group__teacher=user)
         elif user.role == "student":
-            return Score.objects.filter(student__user=user)
-        return Score.objects.filter(group__center=user.center)
+            return self.queryset.filter(student__user=user)
+        return self.queryset.filter(group__center=user.center)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
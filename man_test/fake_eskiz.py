@@ -0,0 +1,77 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeEskizServer:
+    """Testlar uchun lokal Eskiz API: so'rovlar, xabarlar va ulanishlarni yozib boradi.
+
+    ::
+
+        with FakeEskizServer(token="test") as eskiz:
+            with override_settings(ESKIZ_API_URL=eskiz.url, ESKIZ_API_TOKEN="test"):
+                ...
+    """
+
+    def __init__(self, token="test-token", status_code=200):
+        self.token = token
+        self.status_code = status_code
+        self.requests = []
+        self.messages = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive: sessiya ulanishni qayta ishlatishi uchun
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake.lock:
+                    fake.connections.add(self.client_address)
+                    fake.requests.append(self.path)
+
+                if self.headers.get("Authorization") != f"Bearer {fake.token}":
+                    return self.respond(401, {"message": "Unauthorized"})
+                if fake.status_code != 200:
+                    return self.respond(fake.status_code, {"message": "Provider error"})
+
+                if self.path == "/api/message/sms/send-batch":
+                    payload = json.loads(body)
+                    messages = [(m["to"], m["text"]) for m in payload["messages"]]
+                elif self.path == "/api/message/sms/send":
+                    form = parse_qs(body.decode())
+                    messages = [(form["mobile_phone"][0], form["message"][0])]
+                else:
+                    return self.respond(404, {"message": "Not found"})
+
+                with fake.lock:
+                    fake.messages.extend(messages)
+                self.respond(200, {"id": len(fake.requests), "status": "waiting"})
+
+            def respond(self, status_code, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,33 @@
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Har bir test ishga tushirishi uchun alohida fayl kesh katalogi.
+
+    Testlar ``cache.clear()`` qiladi va boshqa jarayondan keshga yozadi -
+    bular serverdagi umumiy kesh katalogiga tegmasligi kerak. Fayl kesh
+    qoldiriladi, shuning uchun jarayonlararo invalidatsiya haqiqiy
+    sharoitdagidek tekshiriladi.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix="mambacrm-test-cache-")
+        self.cache_settings = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.cache_dir,
+                }
+            }
+        )
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,190 @@
+import json
+import os
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+
+from config.urls import router
+from hisoblar.models import User
+from man_test.fake_eskiz import FakeEskizServer
+from notification.models import SMSNotification
+from notification.tasks import send_pending_sms
+from yadro.models import Center
+
+BASELINE_PATH = Path(__file__).resolve().parent / "perf_baseline.json"
+# Baseline'ni qayta yozish: PERF_UPDATE_BASELINE=1 python manage.py test man_test.test_perf
+UPDATE_BASELINE = os.environ.get("PERF_UPDATE_BASELINE") == "1"
+
+MAX_QUERIES = 12
+# Vaqt baseline'dan shuncha marta + LATENCY_SLACK soniyadan oshsa test yiqiladi
+LATENCY_TOLERANCE = 2.0
+LATENCY_SLACK = 0.05
+LATENCY_RUNS = 3
+
+SMS_BENCHMARK_SIZE = 2000
+# Lokal fake serverda kamida shuncha SMS/soniya jo'natilishi kerak
+SMS_MIN_THROUGHPUT = 500
+
+# queryset'i bo'lmagan ViewSet'lar uchun detail obyekt modeli
+DETAIL_MODELS = {
+    "center-analytics": Center,
+}
+
+
+def router_endpoints():
+    """Router'dagi barcha GET endpointlar: (nom, url_name, detail model)"""
+    endpoints = []
+    for prefix, viewset, basename in router.registry:
+        model = DETAIL_MODELS.get(basename)
+        if model is None and getattr(viewset, "queryset", None) is not None:
+            model = viewset.queryset.model
+
+        if hasattr(viewset, "list"):
+            endpoints.append((f"{prefix} list", f"{basename}-list", None))
+        if hasattr(viewset, "retrieve") and model is not None:
+            endpoints.append((f"{prefix} retrieve", f"{basename}-detail", model))
+        for extra in viewset.get_extra_actions():
+            if "get" not in extra.mapping:
+                continue
+            if extra.detail and model is None:
+                continue
+            endpoints.append(
+                (
+                    f"{prefix} {extra.url_name}",
+                    f"{basename}-{extra.url_name}",
+                    model if extra.detail else None,
+                )
+            )
+    return endpoints
+
+
+class EndpointPerformanceTestCase(APITestCase):
+    """Har bir router endpointi uchun so'rovlar soni va javob vaqti"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            "seed_data",
+            centers=1,
+            students_per_center=30,
+            months=1,
+            seed=1,
+            stdout=StringIO(),
+        )
+        cls.admin = User.objects.get(email="admin_panel@mambacrm.uz")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def measure(self):
+        results = {}
+        for name, url_name, model in router_endpoints():
+            args = None
+            if model is not None:
+                args = [model.objects.order_by("pk").values_list("pk", flat=True)[0]]
+            url = reverse(url_name, args=args)
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+                # Eksport kabi oqimli javoblarda so'rovlar o'qish paytida bajariladi
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            self.assertLess(
+                response.status_code, 500, f"{name}: {getattr(response, 'data', '')}"
+            )
+
+            # Shovqinni kamaytirish uchun eng yaxshi natija olinadi
+            timings = []
+            for _ in range(LATENCY_RUNS):
+                cache.clear()
+                started = time.perf_counter()
+                response = self.client.get(url)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                timings.append(time.perf_counter() - started)
+            results[name] = {"queries": len(queries), "seconds": min(timings)}
+        return results
+
+    def test_query_counts_and_latency(self):
+        small = self.measure()
+
+        # Ma'lumot hajmini bir necha barobar oshirib qayta o'lchaymiz
+        call_command(
+            "seed_data",
+            centers=2,
+            students_per_center=90,
+            months=2,
+            seed=2,
+            stdout=StringIO(),
+        )
+        large = self.measure()
+
+        for name, result in large.items():
+            with self.subTest(endpoint=name):
+                self.assertLessEqual(result["queries"], MAX_QUERIES)
+                self.assertEqual(result["queries"], small[name]["queries"])
+
+        baseline = {}
+        if BASELINE_PATH.exists():
+            baseline = json.loads(BASELINE_PATH.read_text())
+
+        if UPDATE_BASELINE:
+            BASELINE_PATH.write_text(
+                json.dumps(
+                    {name: round(r["seconds"], 4) for name, r in large.items()},
+                    indent=2,
+                    sort_keys=True,
+                )
+                + "\n"
+            )
+            return
+
+        missing = sorted(set(large) - set(baseline))
+        if missing:
+            self.fail(
+                "Endpoints missing from perf_baseline.json, regenerate it with "
+                f"PERF_UPDATE_BASELINE=1: {', '.join(missing)}"
+            )
+        for name, result in large.items():
+            with self.subTest(endpoint=name):
+                limit = baseline[name] * LATENCY_TOLERANCE + LATENCY_SLACK
+                self.assertLessEqual(result["seconds"], limit)
+
+
+class SMSDispatchPerformanceTestCase(APITestCase):
+    """Fake Eskiz server orqali SMS dispatcher o'tkazuvchanligi"""
+
+    def test_throughput(self):
+        SMSNotification.objects.bulk_create(
+            SMSNotification(phone=f"+99890{i:07d}", message=f"Eslatma {i}")
+            for i in range(SMS_BENCHMARK_SIZE)
+        )
+
+        with FakeEskizServer(token="bench") as eskiz, override_settings(
+            ESKIZ_API_URL=eskiz.url,
+            ESKIZ_API_TOKEN="bench",
+            SMS_BATCH_SIZE=200,
+            SMS_RATE_LIMITS={},
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                send_pending_sms(batch_size=SMS_BENCHMARK_SIZE)
+                elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(eskiz.messages), SMS_BENCHMARK_SIZE)
+        self.assertEqual(len(eskiz.requests), SMS_BENCHMARK_SIZE // 200)
+        self.assertEqual(len(eskiz.connections), 1)
+        # claim (SELECT + UPDATE + SELECT) + bulk_update bo'laklari - har SMS
+        # uchun alohida save emas
+        self.assertLessEqual(len(queries), SMS_BENCHMARK_SIZE // 50)
+        self.assertGreaterEqual(SMS_BENCHMARK_SIZE / elapsed, SMS_MIN_THROUGHPUT)
+        self.assertFalse(SMSNotification.objects.exclude(status="sent").exists())
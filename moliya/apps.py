@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class MoliyaConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "moliya"
+
+    def ready(self):
+        import moliya.signals  # To'lov statusi o'zgarishini kuzatuvchi signallar
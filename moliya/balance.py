@@ -0,0 +1,121 @@
+from decimal import Decimal
+
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from akademk.models import Student
+from .models import Debt, Payment, StudentBalance
+
+BALANCE_FIELDS = ["total_paid", "total_debt", "open_debt", "open_debts_count"]
+RECONCILE_CHUNK_SIZE = 1000
+
+
+def _balance(values):
+    return values["total_paid"] - values["total_debt"]
+
+
+def live_balances(student_ids):
+    """Balanslarni bevosita jadvallardan hisoblash: ikkita GROUP BY so'rov"""
+    balances = {
+        student_id: {
+            "total_paid": Decimal(0),
+            "total_debt": Decimal(0),
+            "open_debt": Decimal(0),
+            "open_debts_count": 0,
+        }
+        for student_id in student_ids
+    }
+    paid = (
+        Payment.objects.filter(student_id__in=balances, status="paid")
+        .order_by()
+        .values("student_id")
+        .annotate(total=Sum("amount"))
+    )
+    for row in paid:
+        balances[row["student_id"]]["total_paid"] = row["total"]
+
+    debts = (
+        Debt.objects.filter(student_id__in=balances)
+        .order_by()
+        .values("student_id")
+        .annotate(
+            total=Sum("amount"),
+            open=Sum("amount", filter=Q(status__in=Debt.UNPAID_STATUSES)),
+            open_count=Count("id", filter=Q(status__in=Debt.UNPAID_STATUSES)),
+        )
+    )
+    for row in debts:
+        balances[row["student_id"]].update(
+            total_debt=row["total"],
+            open_debt=row["open"] or Decimal(0),
+            open_debts_count=row["open_count"],
+        )
+
+    for values in balances.values():
+        values["balance"] = _balance(values)
+    return balances
+
+
+def reconcile(student_ids=None, chunk_size=RECONCILE_CHUNK_SIZE):
+    """Balanslarni noldan qayta hisoblab farq qilganlarini tuzatish.
+
+    O'quvchilar ``chunk_size`` tadan olinadi: har bir bo'lak uchun ikkita
+    agregat so'rov, yetishmayotgan qatorlar ``bulk_create``, farq
+    qilganlari ``bulk_update`` bilan yoziladi.
+    """
+    students = Student.objects.order_by("id").values_list("id", flat=True)
+    if student_ids is not None:
+        students = students.filter(id__in=student_ids)
+
+    totals = {"checked": 0, "created": 0, "fixed": 0}
+    now = timezone.now()
+    ids = list(students[:chunk_size])
+    while ids:
+        live = live_balances(ids)
+        existing = StudentBalance.objects.in_bulk(ids)
+
+        created = []
+        fixed = []
+        for student_id, values in live.items():
+            row = existing.get(student_id)
+            if row is None:
+                created.append(
+                    StudentBalance(student_id=student_id, reconciled_at=now, **values)
+                )
+                continue
+            if any(getattr(row, field) != value for field, value in values.items()):
+                fixed.append(row)
+            for field, value in values.items():
+                setattr(row, field, value)
+            row.reconciled_at = now
+
+        StudentBalance.objects.bulk_create(created)
+        StudentBalance.objects.bulk_update(
+            existing.values(),
+            BALANCE_FIELDS + ["balance", "reconciled_at"],
+            batch_size=chunk_size,
+        )
+
+        totals["checked"] += len(ids)
+        totals["created"] += len(created)
+        totals["fixed"] += len(fixed)
+        ids = list(students.filter(id__gt=ids[-1])[:chunk_size])
+    return totals
+
+
+def apply_delta(student_id, **deltas):
+    """Balansga atomik F() delta qo'shish (o'zgarish bilan bitta tranzaksiyada).
+
+    Balans qatori hali yaratilmagan bo'lsa hech narsa qilinmaydi - tungi
+    reconcile yoki ``recompute_balances`` buyrug'i to'liq hisoblaydi.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if student_id is None or not deltas:
+        return
+    balance = deltas.get("total_paid", 0) - deltas.get("total_debt", 0)
+    if balance:
+        deltas["balance"] = balance
+    StudentBalance.objects.filter(student_id=student_id).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + value for field, value in deltas.items()},
+    )
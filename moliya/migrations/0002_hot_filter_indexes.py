@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("moliya", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="debt",
+            index=models.Index(
+                fields=["status", "due_date"], name="debts_status_due_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["center", "status", "created_at"],
+                name="payments_center_status_idx",
+            ),
+        ),
+    ]
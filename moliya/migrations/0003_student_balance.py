@@ -0,0 +1,59 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("akademk", "0003_hot_filter_indexes"),
+        ("moliya", "0002_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StudentBalance",
+            fields=[
+                (
+                    "student",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="balance",
+                        serialize=False,
+                        to="akademk.student",
+                    ),
+                ),
+                (
+                    "total_paid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "total_debt",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "open_debt",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("open_debts_count", models.IntegerField(default=0)),
+                (
+                    "balance",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("reconciled_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Student Balance",
+                "verbose_name_plural": "Student Balances",
+                "db_table": "student_balances",
+                "indexes": [
+                    models.Index(
+                        fields=["balance"], name="student_balances_balance_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("moliya", "0003_student_balance"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="debt",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("open", "Open"),
+                    ("overdue", "Overdue"),
+                    ("closed", "Closed"),
+                ],
+                default="open",
+                max_length=20,
+            ),
+        ),
+    ]
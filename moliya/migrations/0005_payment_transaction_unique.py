@@ -0,0 +1,39 @@
+# Generated by Django 4.2.27 on 2026-10-18 08:00
+
+from django.db import migrations, models
+
+
+def clear_duplicate_transactions(apps, schema_editor):
+    """Bir xil (usul, transaction_id) li to'lovlardan birinchisidan boshqasining
+    transaction_id sini bo'shatish - aks holda unique constraint qo'shilmaydi"""
+    Payment = apps.get_model("moliya", "Payment")
+    keys = (
+        Payment.objects.exclude(transaction_id="")
+        .order_by()
+        .values("method", "transaction_id")
+        .annotate(rows=models.Count("id"), first_id=models.Min("id"))
+        .filter(rows__gt=1)
+    )
+    for key in list(keys):
+        Payment.objects.filter(
+            method=key["method"], transaction_id=key["transaction_id"]
+        ).exclude(id=key["first_id"]).update(transaction_id="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("moliya", "0004_debt_overdue_status"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_transactions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("transaction_id", ""), _negated=True),
+                fields=("method", "transaction_id"),
+                name="payments_method_transaction_uniq",
+            ),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.27 on 2026-10-18 08:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("yadro", "0003_hot_filter_indexes"),
+        ("moliya", "0005_payment_transaction_unique"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevenueDaily",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "method",
+                    models.CharField(
+                        choices=[
+                            ("cash", "Cash"),
+                            ("click", "Click"),
+                            ("payme", "Payme"),
+                            ("bank_transfer", "Bank Transfer"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "branch",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="yadro.branch",
+                    ),
+                ),
+                (
+                    "center",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="yadro.center",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Revenue",
+                "verbose_name_plural": "Daily Revenue",
+                "db_table": "revenue_daily",
+                "ordering": ["-day"],
+                "indexes": [
+                    models.Index(
+                        fields=["center", "day"], name="revenue_daily_center_day_idx"
+                    )
+                ],
+                "unique_together": {("center", "branch", "method", "day")},
+            },
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 4.2.27 on 2026-10-18 08:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+
+
+def fill_payment_branch(apps, schema_editor):
+    Payment = apps.get_model("moliya", "Payment")
+    Student = apps.get_model("akademk", "Student")
+    Payment.objects.update(
+        branch_id=models.Subquery(
+            Student.objects.filter(id=models.OuterRef("student_id")).values(
+                "user__branch_id"
+            )[:1]
+        )
+    )
+
+
+def merge_duplicate_rollups(apps, schema_editor):
+    """unique_together NULL filialli takroriy qatorlarni to'smagan - birlashtirish"""
+    RevenueDaily = apps.get_model("moliya", "RevenueDaily")
+    keys = (
+        RevenueDaily.objects.order_by()
+        .values("center_id", "branch_id", "method", "day")
+        .annotate(rows=models.Count("id"))
+        .filter(rows__gt=1)
+    )
+    for key in list(keys):
+        key.pop("rows")
+        first, *rest = RevenueDaily.objects.filter(**key).order_by("id")
+        first.total += sum(row.total for row in rest)
+        first.count += sum(row.count for row in rest)
+        first.save(update_fields=["total", "count"])
+        RevenueDaily.objects.filter(id__in=[row.id for row in rest]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("akademk", "0004_group_center_status_idx"),
+        ("yadro", "0003_hot_filter_indexes"),
+        ("moliya", "0006_revenue_daily"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="revenuedaily",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="payment",
+            name="branch",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="yadro.branch",
+            ),
+        ),
+        migrations.RunPython(fill_payment_branch, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="revenuedaily",
+            name="branch",
+            field=models.ForeignKey(
+                blank=True,
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="+",
+                to="yadro.branch",
+            ),
+        ),
+        migrations.RunPython(merge_duplicate_rollups, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="revenuedaily",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.comparison.Coalesce(
+                    "center", models.Value(0)
+                ),
+                django.db.models.functions.comparison.Coalesce(
+                    "branch", models.Value(0)
+                ),
+                models.F("method"),
+                models.F("day"),
+                name="revenue_daily_key_uniq",
+            ),
+        ),
+    ]
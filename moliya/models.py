@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.utils.translation import gettext_lazy as _
 
 from akademk.models import Student
-from yadro.models import Center
+from yadro.models import Branch, Center
 
 
 class Payment(models.Model):
@@ -29,6 +31,16 @@ class Payment(models.Model):
     student = models.ForeignKey(
         Student, on_delete=models.CASCADE, related_name="attendances"
     )
+    # To'lov paytidagi o'quvchi filiali - daromad rollup'i shu filialga yoziladi.
+    # Filial o'chirilsa ham tarixiy daromad uning id'si bilan qoladi
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
 
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     method = models.CharField(max_length=20, choices=METHOD_CHOICES)
@@ -43,6 +55,31 @@ class Payment(models.Model):
         verbose_name = _("Payment")
         verbose_name_plural = _("Payments")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["center", "status", "created_at"],
+                name="payments_center_status_idx",
+            ),
+        ]
+        constraints = [
+            # Provayder bitta tranzaksiyani qayta yuborsa ikkinchi to'lov yaratilmaydi
+            models.UniqueConstraint(
+                fields=["method", "transaction_id"],
+                condition=~models.Q(transaction_id=""),
+                name="payments_method_transaction_uniq",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.branch_id is None and self.student_id:
+            self.branch_id = (
+                Student.objects.filter(id=self.student_id)
+                .values_list("user__branch_id", flat=True)
+                .first()
+            )
+        # post_save'dagi StudentBalance yangilanishi shu yozuv bilan bitta tranzaksiyada
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.student.user.name if self.student else 'Unknown Student'} - {self.amount}"
@@ -51,8 +88,11 @@ class Payment(models.Model):
 class Debt(models.Model):
     STATUS_CHOICES = [
         ("open", "Open"),
+        ("overdue", "Overdue"),
         ("closed", "Closed"),
     ]
+    # Hali to'lanmagan qarzlar (muddati o'tganlari ham)
+    UNPAID_STATUSES = ["open", "overdue"]
 
     student = models.ForeignKey(
         Student, on_delete=models.SET_NULL, null=True, blank=True, related_name="debts"
@@ -69,6 +109,87 @@ class Debt(models.Model):
         verbose_name = _("Debt")
         verbose_name_plural = _("Debts")
         ordering = ["due_date"]
+        indexes = [
+            models.Index(fields=["status", "due_date"], name="debts_status_due_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # post_save'dagi StudentBalance yangilanishi shu yozuv bilan bitta tranzaksiyada
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.student.user.name if self.student else 'Unknown Student'} - {self.amount}"
+
+
+class StudentBalance(models.Model):
+    """O'quvchi balansi: to'lovlar va qarzlar (signallar orqali yangilanadi)"""
+
+    student = models.OneToOneField(
+        Student, on_delete=models.CASCADE, primary_key=True, related_name="balance"
+    )
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # Barcha qarzlar (ochiq va yopilgan) - yopilgan qarz to'lov bilan qoplangan
+    total_debt = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    # To'lanmagan (open va overdue) qarzlar
+    open_debt = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    open_debts_count = models.IntegerField(default=0)
+    # total_paid - total_debt: manfiy bo'lsa o'quvchi qarzdor
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "student_balances"
+        verbose_name = _("Student Balance")
+        verbose_name_plural = _("Student Balances")
+        indexes = [
+            models.Index(fields=["balance"], name="student_balances_balance_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.balance}"
+
+
+class RevenueDaily(models.Model):
+    """Kunlik daromad rollup'i: markaz, filial, usul va kun bo'yicha to'langan to'lovlar"""
+
+    center = models.ForeignKey(
+        Center, on_delete=models.CASCADE, null=True, blank=True, related_name="+"
+    )
+    branch = models.ForeignKey(
+        Branch,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    method = models.CharField(max_length=20, choices=Payment.METHOD_CHOICES)
+    day = models.DateField()
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "revenue_daily"
+        verbose_name = _("Daily Revenue")
+        verbose_name_plural = _("Daily Revenue")
+        ordering = ["-day"]
+        indexes = [
+            models.Index(fields=["center", "day"], name="revenue_daily_center_day_idx"),
+        ]
+        constraints = [
+            # NULL'lar bir-biriga teng emas - filialsiz o'quvchilar qatori ham
+            # yagona bo'lishi uchun NULL 0 ga almashtiriladi
+            models.UniqueConstraint(
+                Coalesce("center", Value(0)),
+                Coalesce("branch", Value(0)),
+                "method",
+                "day",
+                name="revenue_daily_key_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.center_id} - {self.day} - {self.method}: {self.total}"
@@ -0,0 +1,99 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+from .models import Payment, RevenueDaily
+
+
+def apply_delta(key, **deltas):
+    """Rollup qatoriga atomik F() delta qo'shish, qator bo'lmasa yaratish.
+
+    ``key`` - (center_id, branch_id, method, day); filial to'lovning o'zida
+    saqlangan, shuning uchun o'quvchi filialini almashtirsa ham qaytarish
+    yoki tahrir to'lov hisoblangan qatorga tushadi.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    center_id, branch_id, method, day = key
+    lookup = {
+        "center_id": center_id,
+        "branch_id": branch_id,
+        "method": method,
+        "day": day,
+    }
+    update = {field: F(field) + value for field, value in deltas.items()}
+    if RevenueDaily.objects.filter(**lookup).update(**update):
+        return
+    try:
+        with transaction.atomic():
+            RevenueDaily.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Parallel tranzaksiya qatorni birinchi yaratdi
+        RevenueDaily.objects.filter(**lookup).update(**update)
+
+
+def backfill(date_from=None, date_to=None, center_id=None):
+    """Rollup'ni to'lovlar jadvalidan qayta qurish (bitta GROUP BY).
+
+    Tanlangan oraliqdagi rollup qatorlari o'chirilib qaytadan yoziladi,
+    hammasi bitta tranzaksiyada. Qaytaradi: yozilgan qatorlar soni.
+    """
+    payments = Payment.objects.filter(status="paid")
+    rollups = RevenueDaily.objects.all()
+    if center_id is not None:
+        payments = payments.filter(center_id=center_id)
+        rollups = rollups.filter(center_id=center_id)
+    if date_from:
+        payments = payments.filter(created_at__date__gte=date_from)
+        rollups = rollups.filter(day__gte=date_from)
+    if date_to:
+        payments = payments.filter(created_at__date__lte=date_to)
+        rollups = rollups.filter(day__lte=date_to)
+
+    rows = (
+        payments.annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values("center_id", "branch_id", "method", "day")
+        .annotate(total=Sum("amount"), count=Count("id"))
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = RevenueDaily.objects.bulk_create(
+            (RevenueDaily(**row) for row in rows.iterator()), batch_size=1000
+        )
+    return len(created)
+
+
+def revenue_report(center_id, date_from, date_to):
+    """Oraliq bo'yicha daromad: jami, usul va filial kesimida (rollup'dan)"""
+    rows = (
+        RevenueDaily.objects.filter(
+            center_id=center_id, day__gte=date_from, day__lte=date_to
+        )
+        .order_by()
+        .values("method", "branch_id", branch_name=F("branch__name"))
+        .annotate(total=Sum("total"), count=Sum("count"))
+    )
+
+    report = {"total_revenue": 0, "total_transactions": 0, "by_method": {}}
+    by_branch = {}
+    for row in rows:
+        report["total_revenue"] += row["total"]
+        report["total_transactions"] += row["count"]
+        report["by_method"][row["method"]] = (
+            report["by_method"].get(row["method"], 0) + row["total"]
+        )
+        branch = by_branch.setdefault(
+            row["branch_id"],
+            {
+                "branch": row["branch_id"],
+                "branch_name": row["branch_name"],
+                "total": 0,
+                "count": 0,
+            },
+        )
+        branch["total"] += row["total"]
+        branch["count"] += row["count"]
+    report["by_branch"] = list(by_branch.values())
+    return report
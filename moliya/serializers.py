@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Payment, Debt
+from .models import Payment, Debt, StudentBalance
 
 
 from rest_framework import serializers
@@ -28,11 +28,21 @@ class PaymentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class StudentBalanceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StudentBalance
+        fields = ['total_paid', 'total_debt', 'open_debt', 'open_debts_count', 'balance', 'updated_at']
+        read_only_fields = fields
+
+
 class DebtSerializer(serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.user.name', read_only=True)
+    student_balance = serializers.DecimalField(
+        source='student.balance.balance', max_digits=14, decimal_places=2, read_only=True
+    )
 
     class Meta:
         model = Debt
-        fields = ['id', 'student', 'student_name', 'amount', 'due_date', 'status', 'description', 'created_at',
-                  'updated_at']
+        fields = ['id', 'student', 'student_name', 'student_balance', 'amount', 'due_date', 'status', 'description',
+                  'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
@@ -0,0 +1,124 @@
+from decimal import Decimal
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from akademk.models import Student
+from yadro.snapshots import track
+from . import balance, revenue
+from .models import Debt, Payment, StudentBalance
+
+# To'lov statusi o'zgarganda yuboriladi: (instance, old_status, new_status).
+# Yangi to'lovda old_status=None, o'chirilganda new_status=None bo'ladi.
+payment_status_changed = Signal()
+
+_UNKNOWN = object()
+
+
+@receiver(post_init, sender=Payment)
+def remember_status(sender, instance, **kwargs):
+    if instance.pk is None:
+        instance._original_status = None
+    else:
+        # status deferred bo'lsa uni shu yerda yuklamaymiz
+        instance._original_status = instance.__dict__.get("status", _UNKNOWN)
+
+
+@receiver(pre_save, sender=Payment)
+def load_status(sender, instance, **kwargs):
+    if not instance._state.adding and instance._original_status is _UNKNOWN:
+        instance._original_status = (
+            Payment.objects.filter(pk=instance.pk)
+            .values_list("status", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Payment)
+def detect_status_change(sender, instance, created, **kwargs):
+    old_status = None if created else instance._original_status
+    instance._original_status = instance.status
+    if old_status != instance.status:
+        payment_status_changed.send(
+            sender=sender,
+            instance=instance,
+            old_status=old_status,
+            new_status=instance.status,
+        )
+
+
+@receiver(post_delete, sender=Payment)
+def detect_payment_removed(sender, instance, **kwargs):
+    old_status = instance._original_status
+    if old_status is _UNKNOWN:
+        old_status = instance.__dict__.get("status")
+    payment_status_changed.send(
+        sender=sender,
+        instance=instance,
+        old_status=old_status,
+        new_status=None,
+    )
+
+
+@receiver(payment_status_changed)
+def invalidate_statistics(sender, instance, **kwargs):
+    from .stats import invalidate_revenue_statistics
+
+    invalidate_revenue_statistics(instance.center_id)
+
+
+# ----------------- Snapshot jadvallari -----------------
+def _paid_amount(payment):
+    return Decimal(str(payment.amount)) if payment.status == "paid" else Decimal(0)
+
+
+# Student balance: to'lovlar va qarzlar
+track(
+    Payment,
+    "balance",
+    ["student_id", "status", "amount"],
+    lambda obj: (obj.student_id, {"total_paid": _paid_amount(obj)}),
+    balance.apply_delta,
+)
+track(
+    Debt,
+    "balance",
+    ["student_id", "status", "amount"],
+    lambda obj: (
+        obj.student_id,
+        {
+            "total_debt": Decimal(str(obj.amount)),
+            "open_debt": (
+                Decimal(str(obj.amount))
+                if obj.status in Debt.UNPAID_STATUSES
+                else Decimal(0)
+            ),
+            "open_debts_count": 1 if obj.status in Debt.UNPAID_STATUSES else 0,
+        },
+    ),
+    balance.apply_delta,
+)
+
+# Kunlik daromad: (markaz, to'lov paytidagi filial, usul, kun)
+track(
+    Payment,
+    "revenue",
+    ["center_id", "branch_id", "method", "status", "amount", "created_at"],
+    lambda obj: (
+        (
+            obj.center_id,
+            obj.branch_id,
+            obj.method,
+            timezone.localdate(obj.created_at),
+        ),
+        {"total": _paid_amount(obj), "count": 1 if obj.status == "paid" else 0},
+    ),
+    revenue.apply_delta,
+)
+
+
+@receiver(post_save, sender=Student)
+def create_balance(sender, instance, created, **kwargs):
+    if created:
+        StudentBalance.objects.get_or_create(student=instance)
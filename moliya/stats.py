@@ -0,0 +1,89 @@
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from .models import Payment
+
+BUCKETS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+STATISTICS_TIMEOUT = 60 * 60
+
+
+def _version_key(center_id):
+    return f"payment-stats-version:{center_id or 'all'}"
+
+
+def statistics_cache_key(center_id, *parts):
+    # Versiya kalitini kesh (culling) o'chirib yuborsa ham yangi versiya eski
+    # ma'lumot kalitlariga tushmasligi uchun vaqtdan boshlanadi
+    version = cache.get_or_set(_version_key(center_id), time.time_ns, None)
+    return ":".join(
+        ["payment-stats", str(center_id or "all"), str(version)] + [str(p) for p in parts]
+    )
+
+
+def invalidate_revenue_statistics(center_id):
+    """Markaz (va superadmin umumiy) statistikasi keshini eskirtirish"""
+    for key in {_version_key(center_id), _version_key(None)}:
+        try:
+            cache.incr(key)
+        except ValueError:
+            pass
+
+
+def revenue_statistics(payments, bucket="day"):
+    """To'lov usuli, filial va vaqt bo'lagi bo'yicha bitta GROUP BY"""
+    rows = (
+        payments.annotate(period=BUCKETS[bucket]("created_at"))
+        .values(
+            "method",
+            "period",
+            "branch_id",
+            "branch__name",
+        )
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by("period")
+    )
+
+    total_revenue = 0
+    total_transactions = 0
+    by_method = {method: 0 for method, _ in Payment.METHOD_CHOICES}
+    by_branch = {}
+    by_period = {}
+
+    for row in rows:
+        total_revenue += row["total"]
+        total_transactions += row["count"]
+        by_method[row["method"]] = by_method.get(row["method"], 0) + row["total"]
+
+        branch = by_branch.setdefault(
+            row["branch_id"],
+            {
+                "branch": row["branch_id"],
+                "branch_name": row["branch__name"],
+                "total": 0,
+                "count": 0,
+            },
+        )
+        branch["total"] += row["total"]
+        branch["count"] += row["count"]
+
+        period = by_period.setdefault(
+            row["period"], {"period": row["period"], "total": 0, "count": 0}
+        )
+        period["total"] += row["total"]
+        period["count"] += row["count"]
+
+    return {
+        "total_revenue": total_revenue,
+        "total_transactions": total_transactions,
+        "by_method": by_method,
+        "by_branch": list(by_branch.values()),
+        "by_period": list(by_period.values()),
+    }
@@ -1,43 +1,45 @@
+import time
 from datetime import timedelta
 from celery import shared_task
+from django.db import connection, transaction
 from django.utils import timezone
-from akademk.models import Enrollment
-from django.core.mail import send_mail
-from notification.models import Notification, SMSNotification, EmailNotification
+from django.db.models import F, Sum
+from notification.fanout import fan_out
+from notification.ledger import only_new
+from .balance import reconcile
+from .revenue import backfill
 from .models import Payment, Debt
 
 
 @shared_task
 def process_payment_notification(payment_id):
     try:
-        payment = Payment.objects.get(id=payment_id)
-        student = payment.student
+        payment = Payment.objects.select_related("student__user").get(id=payment_id)
+        user = payment.student.user
 
-        Notification.objects.create(
-            user=student.user,
+        fan_out(
+            [{"user_id": user.id, "phone": user.phone, "email": user.email}],
             title="To'lov qabul qilindi",
-            message=f"{payment.amount:,.0f} so'm to'lovingiz muvaffaqiyatli qabul qilindi.",
-            type="success",
-            link="/payments",
-        )
+            message="{amount:,.0f} so'm to'lovingiz muvaffaqiyatli qabul qilindi.",
+            sms="Hurmatli {name}, {amount:,.0f} so'm to'lovingiz qabul qilindi. Rahmat!",
+            email_subject="To'lov tasdiqlanди",
+            email_body="""
+            Hurmatli {name},
 
-        SMSNotification.objects.create(
-            phone=student.user.phone,
-            message=f"Hurmatli {student.user.name}, {payment.amount:,.0f} so'm to'lovingiz qabul qilindi. Rahmat!",
-        )
-
-        EmailNotification.objects.create(
-            to_email=student.user.email,
-            subject="To'lov tasdiqlanди",
-            body=f"""
-            Hurmatli {student.user.name},
-
-            {payment.amount:,.0f} so'm to'lovingiz muvaffaqiyatli qabul qilindi.
-            To'lov usuli: {payment.get_method_display()}
-            Sana: {payment.created_at.strftime('%d.%m.%Y %H:%M')}
+            {amount:,.0f} so'm to'lovingiz muvaffaqiyatli qabul qilindi.
+            To'lov usuli: {method}
+            Sana: {date}
 
             Rahmat!
             """,
+            type="success",
+            link="/payments",
+            context={
+                "name": user.name,
+                "amount": payment.amount,
+                "method": payment.get_method_display(),
+                "date": payment.created_at.strftime("%d.%m.%Y %H:%M"),
+            },
         )
 
         return f"Payment notification sent for payment #{payment.id}"
@@ -46,73 +48,142 @@ def process_payment_notification(payment_id):
         return f"Error: {str(e)}"
 
 
-@shared_task
-def check_overdue_debts():
-    today = timezone.now().date()
-    overdue_debts = Debt.objects.filter(status="pending", due_date__lt=today)
+OVERDUE_BATCH_SIZE = 1000
 
-    count = 0
-    for debt in overdue_debts:
-        debt.status = "overdue"
-        debt.save()
 
-        Notification.objects.create(
-            user=debt.student.user,
+def _mark_overdue(today, batch_size):
+    """Bitta batch: ``open`` -> ``overdue`` va o'tkazilgan qarzlar egalariga xabar.
+
+    Postgres'da nomzodlar ``FOR UPDATE SKIP LOCKED`` bilan olinadi, shuning
+    uchun bir vaqtda ishlayotgan ikkinchi task ularni kutmaydi. Shartli
+    UPDATE qarzni faqat bir marta o'tkazadi; aynan shu ishga tushirish
+    o'tkazgan qatorlar ``updated_at`` belgisi bo'yicha bitta joined
+    ``values()`` bilan o'qiladi (UPDATE ... RETURNING o'rniga).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = Debt.objects.filter(status="open", due_date__lt=today)
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.order_by("id").values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return None
+
+        marked = Debt.objects.filter(id__in=ids, status="open").update(
+            status="overdue", updated_at=now
+        )
+        overdue = (
+            Debt.objects.filter(id__in=ids, status="overdue", updated_at=now)
+            .order_by()
+            .values(
+                "amount",
+                user_id=F("student__user_id"),
+                phone=F("student__user__phone"),
+            )
+        )
+        counts = fan_out(
+            overdue,
             title="Qarzdorlik eslatmasi",
-            message=f"Sizning {debt.amount:,.0f} so'm qarzdorligingiz muddati o'tgan.",
+            message="Sizning {amount:,.0f} so'm qarzdorligingiz muddati o'tgan.",
+            sms="DIQQAT! {amount:,.0f} so'm qarzdorligingiz muddati o'tgan. Iltimos tezroq to'lang.",
             type="error",
             link="/debts",
+            digest=True,
+            chunk_size=batch_size,
         )
+    # To'liq bo'lmagan batch - navbatda boshqa qarz qolmagan
+    return marked, counts, len(ids) == batch_size
 
-        SMSNotification.objects.create(
-            phone=debt.student.user.phone,
-            message=f"DIQQAT! {debt.amount:,.0f} so'm qarzdorligingiz muddati o'tgan. Iltimos tezroq to'lang.",
-        )
 
-        count += 1
+@shared_task
+def check_overdue_debts(batch_size=OVERDUE_BATCH_SIZE):
+    started = time.monotonic()
+    today = timezone.localdate()
+
+    totals = {"debts": 0, "batches": 0, "notifications": 0, "sms": 0}
+    while True:
+        result = _mark_overdue(today, batch_size)
+        if result is None:
+            break
+        marked, counts, more = result
+        totals["debts"] += marked
+        totals["batches"] += 1
+        totals["notifications"] += counts["notifications"]
+        totals["sms"] += counts["sms"]
+        if not more:
+            break
+
+    return (
+        f"Marked {totals['debts']} debts overdue in {totals['batches']} batches: "
+        f"{totals['notifications']} notifications, {totals['sms']} SMS "
+        f"in {time.monotonic() - started:.2f}s"
+    )
 
-    return f"Checked {count} overdue debts"
+
+# Eslatmalar bazadan shu o'lchamdagi bo'laklarda o'qiladi va yoziladi
+REMINDER_CHUNK_SIZE = 2000
 
 
 @shared_task
 def send_payment_reminder_before_due(days_before=3):
-    target_date = timezone.now().date() + timedelta(days=days_before)
-    upcoming_debts = Debt.objects.filter(status="pending", due_date=target_date)
-
-    for debt in upcoming_debts:
-        Notification.objects.create(
-            user=debt.student.user,
-            title="To'lov eslatmasi",
-            message=f"{days_before} kundan keyin {debt.amount:,.0f} so'm to'lovingiz muddati tugaydi.",
-            type="warning",
-            link="/debts",
+    target_date = timezone.localdate() + timedelta(days=days_before)
+
+    # Bitta GROUP BY: har bir o'quvchining muddati yaqin ochiq qarzlari
+    # yig'indisi foydalanuvchi kontaktlari bilan birga, iterator orqali
+    recipients = (
+        Debt.objects.filter(
+            status__in=Debt.UNPAID_STATUSES,
+            due_date__lte=target_date,
+            student__isnull=False,
         )
-
-        SMSNotification.objects.create(
-            phone=debt.student.user.phone,
-            message=f"Eslatma: {days_before} kundan keyin {debt.amount:,.0f} so'm to'lov muddati tugaydi.",
+        .order_by()
+        .values(
+            subject_id=F("student_id"),
+            user_id=F("student__user_id"),
+            phone=F("student__user__phone"),
+            email=F("student__user__email"),
+            name=F("student__user__name"),
         )
+        .annotate(total_debt=Sum("amount"))
+    )
 
-    return f"Sent reminders for {upcoming_debts.count()} debts"
+    # Beat har minut ishlaydi - har bir o'quvchiga kuniga bir marta
+    counts = fan_out(
+        only_new(
+            recipients,
+            "payment_due",
+            target_date.isoformat(),
+            chunk_size=REMINDER_CHUNK_SIZE,
+        ),
+        title="To'lov eslatmasi",
+        message="Sizning {total_debt:,.0f} so'm qarzdorligingiz bor.",
+        sms="Hurmatli {name}, sizning {total_debt:,.0f} so'm qarzdorligingiz bor. Iltimos to'lovni amalga oshiring.",
+        email_subject="To'lov eslatmasi",
+        email_body="Hurmatli {name}, sizning {total_debt:,.0f} so'm qarzdorligingiz bor.\n\nIltimos to'lovni amalga oshiring.",
+        type="warning",
+        link="/payments",
+        digest=True,
+        chunk_size=REMINDER_CHUNK_SIZE,
+    )
+
+    return f"Payment reminders queued for {counts['notifications']} students"
 
 
 @shared_task
-def send_payment_reminder_before_due():
+def reconcile_student_balances():
+    totals = reconcile()
+    return (
+        f"Reconciled {totals['checked']} student balances: "
+        f"{totals['created']} created, {totals['fixed']} fixed"
+    )
 
-    now = timezone.now()
 
-    due_soon = Enrollment.objects.filter(
-        due_date__date=now.date() + timezone.timedelta(days=1), is_paid=False
-    )
+# Delta'lar o'tkazib yuborgan o'zgarishlar (bulk update, qo'lda SQL) shu
+# oraliqda tuzatiladi
+REVENUE_BACKFILL_DAYS = 3
 
-    for enrollment in due_soon:
-        user_email = enrollment.student.user.email
-        send_mail(
-            subject="Payment Reminder",
-            message=f"Hello {enrollment.student.user.first_name}, your payment is due tomorrow!",
-            from_email="noreply@example.com",
-            recipient_list=[user_email],
-            fail_silently=True,
-        )
 
-    print(f"{due_soon.count()} payment reminders sent!")
+@shared_task
+def backfill_recent_revenue(days=REVENUE_BACKFILL_DAYS):
+    rows = backfill(date_from=timezone.localdate() - timedelta(days=days))
+    return f"Rebuilt {rows} daily revenue rows for the last {days} days"
@@ -1,59 +1,152 @@
+import hashlib
+import hmac
+from decimal import Decimal, InvalidOperation
+
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_date
 from .serializers import PaymentSerializer, DebtSerializer
 from akademk.ruxsatnomalar import IsManager
 from rest_framework import viewsets, status
 from drf_spectacular.utils import extend_schema, extend_schema_view
+from yadro.export import CSVExportMixin
 from .models import Payment, Debt
+from .stats import (
+    BUCKETS,
+    STATISTICS_TIMEOUT,
+    revenue_statistics,
+    statistics_cache_key,
+)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
-    queryset = Payment.objects.all()
+def _click_signature_valid(data):
+    """Click ``sign_string`` ni tekshirish.
+
+    MD5(click_trans_id + service_id + secret_key + merchant_trans_id +
+    amount + action + sign_time). Kalit sozlanmagan bo'lsa imzoni
+    tekshirib bo'lmaydi - callback rad etiladi.
+    """
+    if not settings.CLICK_SECRET_KEY:
+        return False
+    expected = hashlib.md5(
+        "".join(
+            [
+                str(data.get("click_trans_id", "")),
+                str(data.get("service_id", "")),
+                settings.CLICK_SECRET_KEY,
+                str(data.get("merchant_trans_id", "")),
+                str(data.get("amount", "")),
+                str(data.get("action", "")),
+                str(data.get("sign_time", "")),
+            ]
+        ).encode()
+    ).hexdigest()
+    return hmac.compare_digest(expected, str(data.get("sign_string", "")))
+
+
+def _parse_date_param(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format")
+    return parsed
+
+
+@extend_schema_view(
+    list=extend_schema(summary="List all payments"),
+    retrieve=extend_schema(summary="Get payment by ID"),
+    create=extend_schema(summary="Create new payment"),
+    update=extend_schema(summary="Update payment"),
+    partial_update=extend_schema(summary="Partially update payment"),
+    destroy=extend_schema(summary="Delete payment"),
+)
+class PaymentViewSet(CSVExportMixin, viewsets.ModelViewSet):
+    """
+    To'lovlar boshqaruvi - Celery bilan
+    """
+
+    queryset = Payment.objects.select_related("student__user", "center")
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated, IsManager]
     filterset_fields = ["center", "student", "method", "status"]
-    search_fields = ["transaction_id"]
+    search_fields = ["student__user__name", "transaction_id"]
+    export_filename = "payments"
+    export_fields = [
+        ("ID", "id"),
+        ("Sana", "created_at"),
+        ("O'quvchi", "student__user__name"),
+        ("Telefon", "student__user__phone"),
+        ("Markaz", "center__name"),
+        ("Summa", "amount"),
+        ("Usul", "method"),
+        ("Status", "status"),
+        ("Tranzaksiya", "transaction_id"),
+        ("Izoh", "description"),
+    ]
 
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Payment.objects.all()
-        return Payment.objects.filter(center=user.center)
+            return self.queryset.all()
+        return self.queryset.filter(center=user.center)
 
     def perform_create(self, serializer):
+        """To'lov yaratilganda asinxron bildirishnoma yuborish"""
+        from .tasks import process_payment_notification
+
         if self.request.user.role != "superadmin":
-            serializer.save(center=self.request.user.center)
+            payment = serializer.save(center=self.request.user.center)
         else:
-            serializer.save()
+            payment = serializer.save()
+        transaction.on_commit(lambda: process_payment_notification.delay(payment.id))
 
+    @extend_schema(
+        summary="Revenue statistics",
+        description="Usul, filial va kun/hafta/oy bo'yicha daromad (from, to, bucket)",
+    )
     @action(detail=False, methods=["get"])
     def statistics(self, request):
         user = request.user
+        center_id = None if user.role == "superadmin" else user.center_id
 
-        if user.role == "superadmin":
-            payments = Payment.objects.filter(status="paid")
-        else:
-            payments = Payment.objects.filter(center=user.center, status="paid")
-
-        total_revenue = payments.aggregate(total=Sum("amount"))["total"] or 0
-
-        by_method = {}
-        for method, _ in Payment.METHOD_CHOICES:
-            amount = (
-                payments.filter(method=method).aggregate(total=Sum("amount"))["total"]
-                or 0
+        bucket = request.query_params.get("bucket", "day")
+        if bucket not in BUCKETS:
+            return Response(
+                {"error": f"bucket must be one of: {', '.join(BUCKETS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            by_method[method] = amount
-
-        return Response(
-            {
-                "total_revenue": total_revenue,
-                "by_method": by_method,
-                "total_transactions": payments.count(),
+        try:
+            date_from = _parse_date_param(request, "from")
+            date_to = _parse_date_param(request, "to")
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        cache_key = statistics_cache_key(center_id, bucket, date_from, date_to)
+        data = cache.get(cache_key)
+        if data is None:
+            payments = Payment.objects.filter(status="paid")
+            if center_id is not None:
+                payments = payments.filter(center_id=center_id)
+            if date_from:
+                payments = payments.filter(created_at__date__gte=date_from)
+            if date_to:
+                payments = payments.filter(created_at__date__lte=date_to)
+
+            data = {
+                **revenue_statistics(payments, bucket),
+                "bucket": bucket,
+                "from": date_from,
+                "to": date_to,
             }
-        )
+            cache.set(cache_key, data, STATISTICS_TIMEOUT)
+
+        return Response(data)
 
     @action(detail=False, methods=["post"])
     def click_init(self, request):
@@ -79,76 +172,86 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"], permission_classes=[])
     def click_callback(self, request):
-        """Handle Click payment callback"""
-        click_trans_id = request.data.get("click_trans_id")
-        merchant_trans_id = request.data.get("merchant_trans_id")
-        error_code = request.data.get("error")
+        """Handle Click payment callback.
+
+        Endpoint ochiq, shuning uchun avval Click imzosi (``sign_string``),
+        so'ng summa to'lovnikiga mosligi tekshiriladi. Click javob kelmasa
+        callback'ni qayta yuboradi, shuning uchun handler idempotent: to'lov
+        qatori lock qilinadi, faqat ``pending`` dan o'tkaziladi, takroriy
+        callback o'sha natijani qaytaradi. Bildirishnoma commitdan keyin
+        navbatga qo'yiladi - provayderga javob kutmaydi.
+        """
+        from .tasks import process_payment_notification
 
+        if not _click_signature_valid(request.data):
+            return Response(
+                {"error": "Invalid signature"}, status=status.HTTP_403_FORBIDDEN
+            )
         try:
-            payment = Payment.objects.get(id=merchant_trans_id)
-
-            if error_code == 0:
-                payment.status = "paid"
-                payment.transaction_id = click_trans_id
-            else:
-                payment.status = "failed"
-
-            payment.save()
+            amount = Decimal(str(request.data.get("amount")))
+        except InvalidOperation:
+            amount = None
+        if amount is None or not amount.is_finite():
+            return Response(
+                {"error": "Incorrect amount"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-            return Response({"status": "success"})
-        except Payment.DoesNotExist:
+        click_trans_id = str(request.data.get("click_trans_id") or "")
+        merchant_trans_id = str(request.data.get("merchant_trans_id") or "")
+        paid = str(request.data.get("error")) == "0"
+        if not merchant_trans_id.isdigit():
             return Response(
                 {"error": "Payment not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+        new_status = "paid" if paid else "failed"
+        try:
+            with transaction.atomic():
+                payment = (
+                    Payment.objects.select_for_update()
+                    .filter(id=merchant_trans_id, method="click")
+                    .first()
+                )
+                if payment is None:
+                    return Response(
+                        {"error": "Payment not found"},
+                        status=status.HTTP_404_NOT_FOUND,
+                    )
+                if amount != payment.amount:
+                    return Response(
+                        {"error": "Incorrect amount"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+
+                if payment.status != "pending":
+                    # Takroriy callback - allaqachon shu natija bilan yakunlangan
+                    if payment.status == new_status and (
+                        not paid or payment.transaction_id == click_trans_id
+                    ):
+                        return Response({"status": "success"})
+                    return Response(
+                        {"error": f"Payment is already {payment.status}"},
+                        status=status.HTTP_409_CONFLICT,
+                    )
+
+                payment.status = new_status
+                update_fields = ["status", "updated_at"]
+                if paid:
+                    payment.transaction_id = click_trans_id
+                    update_fields.append("transaction_id")
+                payment.save(update_fields=update_fields)
+
+                if paid:
+                    transaction.on_commit(
+                        lambda: process_payment_notification.delay(payment.id)
+                    )
+        except IntegrityError:
+            # Bu click_trans_id boshqa to'lovga yozilgan
+            return Response(
+                {"error": "Duplicate transaction"}, status=status.HTTP_409_CONFLICT
+            )
 
-class DebtViewSet(viewsets.ModelViewSet):
-    queryset = Debt.objects.all()
-    serializer_class = DebtSerializer
-    permission_classes = [IsAuthenticated, IsManager]
-    filterset_fields = ["student", "status"]
-
-    def get_queryset(self):
-        user = self.request.user
-        if user.role == "superadmin":
-            return Debt.objects.all()
-        return Debt.objects.filter(student__user__center=user.center)
-
-    @action(detail=True, methods=["post"])
-    def close(self, request, pk=None):
-        debt = self.get_object()
-        debt.status = "closed"
-        debt.save()
-
-        serializer = self.get_serializer(debt)
-        return Response(serializer.data)
-
-
-@extend_schema_view(
-    list=extend_schema(summary="List all payments"),
-    retrieve=extend_schema(summary="Get payment by ID"),
-    create=extend_schema(summary="Create new payment"),
-    update=extend_schema(summary="Update payment"),
-    partial_update=extend_schema(summary="Partially update payment"),
-    destroy=extend_schema(summary="Delete payment"),
-)
-class PaymentViewSet(viewsets.ModelViewSet):
-    """
-    To'lovlar boshqaruvi - Celery bilan
-    """
-
-    queryset = Payment.objects.all()
-    serializer_class = PaymentSerializer
-    permission_classes = [IsAuthenticated]
-    filterset_fields = ["student", "status", "method"]
-    search_fields = ["student__user__name", "transaction_id"]
-
-    def perform_create(self, serializer):
-        """To'lov yaratilganda asinxron bildirishnoma yuborish"""
-        from .tasks import process_payment_notification
-
-        payment = serializer.save()
-        process_payment_notification.delay(payment.id)
+        return Response({"status": "success"})
 
     @extend_schema(
         summary="Confirm payment",
@@ -167,10 +270,10 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        payment.status = "completed"
+        payment.status = "paid"
         payment.save()
 
-        process_payment_notification.delay(payment.id)
+        transaction.on_commit(lambda: process_payment_notification.delay(payment.id))
 
         return Response(
             {
@@ -186,6 +289,8 @@ class PaymentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["post"])
     def send_reminders(self, request):
         """Qarzdorlar uchun eslatma yuborish"""
+        from .tasks import send_payment_reminder_before_due
+
         days_before = request.data.get("days_before", 3)
 
         task = send_payment_reminder_before_due.delay(days_before)
@@ -201,24 +306,64 @@ class PaymentViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(summary="Partially update debt"),
     destroy=extend_schema(summary="Delete debt"),
 )
-class DebtViewSet(viewsets.ModelViewSet):
+class DebtViewSet(CSVExportMixin, viewsets.ModelViewSet):
     """
     Qarzlar boshqaruvi
     """
 
-    queryset = Debt.objects.all()
+    queryset = Debt.objects.select_related("student__user", "student__balance")
     serializer_class = DebtSerializer
     permission_classes = [IsAuthenticated]
-    filterset_fields = ["student", "status"]
+    filterset_fields = {
+        "student": ["exact"],
+        "status": ["exact"],
+        "amount": ["lt", "lte", "gt", "gte"],
+        "student__balance__balance": ["lt", "lte", "gt", "gte"],
+    }
     search_fields = ["student__user__name"]
+    export_filename = "debts"
+    export_fields = [
+        ("ID", "id"),
+        ("O'quvchi", "student__user__name"),
+        ("Telefon", "student__user__phone"),
+        ("Summa", "amount"),
+        ("Muddat", "due_date"),
+        ("Status", "status"),
+        ("Balans", "student__balance__balance"),
+        ("Izoh", "description"),
+        ("Yaratilgan", "created_at"),
+    ]
+    ordering_fields = [
+        "id",
+        "amount",
+        "due_date",
+        "status",
+        "created_at",
+        "student__balance__balance",
+    ]
 
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Debt.objects.all()
+            return self.queryset.all()
         elif user.role == "student":
-            return Debt.objects.filter(student__user=user)
-        return Debt.objects.filter(student__user__center=user.center)
+            return self.queryset.filter(student__user=user)
+        return self.queryset.filter(student__user__center=user.center)
+
+    @extend_schema(
+        summary="Close debt",
+        description="Qarzni yopish (o'quvchi balansi shu tranzaksiyada yangilanadi)",
+    )
+    @action(
+        detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsManager]
+    )
+    def close(self, request, pk=None):
+        debt = self.get_object()
+        debt.status = "closed"
+        debt.save()
+
+        serializer = self.get_serializer(debt)
+        return Response(serializer.data)
 
     @extend_schema(
         summary="Send reminder to student",
@@ -1,5 +1,12 @@
 from django.contrib import admin
-from .models import Notification, EmailNotification, SMSNotification, PushNotification
+from .models import (
+    Notification,
+    EmailNotification,
+    SMSNotification,
+    PushNotification,
+    DeviceToken,
+    DeliveryStats,
+)
 
 
 @admin.register(Notification)
@@ -15,7 +22,7 @@ class EmailNotificationAdmin(admin.ModelAdmin):
     list_display = ["to_email", "subject", "status", "created_at", "sent_at"]
     list_filter = ["status", "created_at"]
     search_fields = ["to_email", "subject"]
-    readonly_fields = ["created_at", "sent_at"]
+    readonly_fields = ["created_at", "sent_at", "claimed_at", "lease_until"]
 
 
 @admin.register(SMSNotification)
@@ -23,7 +30,7 @@ class SMSNotificationAdmin(admin.ModelAdmin):
     list_display = ["phone", "message", "status", "provider", "created_at", "sent_at"]
     list_filter = ["status", "provider", "created_at"]
     search_fields = ["phone", "message"]
-    readonly_fields = ["created_at", "sent_at"]
+    readonly_fields = ["created_at", "sent_at", "claimed_at", "lease_until"]
 
 
 @admin.register(PushNotification)
@@ -31,4 +38,19 @@ class PushNotificationAdmin(admin.ModelAdmin):
     list_display = ["user", "title", "status", "created_at", "sent_at"]
     list_filter = ["status", "created_at"]
     search_fields = ["user__name", "title", "body"]
-    readonly_fields = ["created_at", "sent_at"]
+    readonly_fields = ["created_at", "sent_at", "claimed_at", "lease_until"]
+
+
+@admin.register(DeviceToken)
+class DeviceTokenAdmin(admin.ModelAdmin):
+    list_display = ["user", "platform", "provider", "is_active", "updated_at"]
+    list_filter = ["platform", "provider", "is_active"]
+    search_fields = ["user__name", "user__email", "token"]
+    readonly_fields = ["created_at", "updated_at"]
+
+
+@admin.register(DeliveryStats)
+class DeliveryStatsAdmin(admin.ModelAdmin):
+    list_display = ["day", "channel", "status", "provider", "count"]
+    list_filter = ["channel", "status", "provider", "day"]
+    date_hierarchy = "day"
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class NotificationConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "notification"
+
+    def ready(self):
+        import notification.signals  # O'qilmaganlar hisoblagichini eskirtiruvchi signallar
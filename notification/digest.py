@@ -0,0 +1,124 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import EmailNotification, SMSNotification
+
+DIGEST_BATCH_SIZE = 500
+
+
+def hold_until():
+    """Digest oynasi tugaydigan vaqt, oyna o'chirilgan bo'lsa None"""
+    window = settings.NOTIFICATION_DIGEST_WINDOW
+    if not window:
+        return None
+    return timezone.now() + timedelta(seconds=window)
+
+
+def _pack(parts, limit, separator="\n"):
+    """Matnlarni ``limit`` belgidan oshmaydigan xabarlarga ketma-ket joylash"""
+    packs = []
+    for part in parts:
+        if packs and len(packs[-1]) + len(separator) + len(part) <= limit:
+            packs[-1] += separator + part
+        else:
+            packs.append(part)
+    return packs
+
+
+def _merge_sms(rows):
+    """Bir raqamga ketayotgan SMS'lar - provayder uzunlik chegarasi ichida"""
+    packs = _pack([sms.message for sms in rows], settings.SMS_DIGEST_MAX_LENGTH)
+    for sms, message in zip(rows, packs):
+        sms.message = message
+    return rows[: len(packs)]
+
+
+def _merge_emails(rows):
+    """Bir manzilga ketayotgan xatlar - bitta xatga"""
+    if len(rows) == 1:
+        return rows
+    first = rows[0]
+    first.body = "\n\n---\n\n".join(
+        f"{email.subject}\n\n{email.body}" for email in rows
+    )
+    first.subject = f"{len(rows)} ta yangi bildirishnoma"
+    return [first]
+
+
+# Model: (qabul qiluvchi kalitlari, birlashtirish funksiyasi, o'zgaradigan maydonlar)
+DIGESTS = {
+    SMSNotification: (("phone", "provider"), _merge_sms, ["message", "hold_until"]),
+    EmailNotification: (
+        ("to_email",),
+        _merge_emails,
+        ["subject", "body", "hold_until"],
+    ),
+}
+
+
+def _release_batch(model, now, batch_size):
+    keys, merge, fields = DIGESTS[model]
+    held = model.objects.filter(status="pending", hold_until__isnull=False)
+
+    with transaction.atomic():
+        due = set(
+            held.filter(hold_until__lte=now)
+            .order_by()
+            .values_list(*keys)
+            .distinct()[:batch_size]
+        )
+        if not due:
+            return None
+
+        rows = held.filter(**{f"{keys[0]}__in": {key[0] for key in due}})
+        if connection.features.has_select_for_update:
+            # Parallel worker shu qabul qiluvchilarni ikkinchi marta birlashtirmaydi
+            rows = rows.select_for_update()
+
+        groups = defaultdict(list)
+        for row in rows.order_by("created_at", "id"):
+            key = tuple(getattr(row, field) for field in keys)
+            if key in due:
+                groups[key].append(row)
+
+        released = []
+        merged_ids = []
+        for items in groups.values():
+            kept = merge(items)
+            released.extend(kept)
+            merged_ids.extend(row.id for row in items[len(kept) :])
+
+        for row in released:
+            row.hold_until = None
+        model.objects.bulk_update(released, fields, batch_size=1000)
+        for start in range(0, len(merged_ids), 1000):
+            model.objects.filter(id__in=merged_ids[start : start + 1000]).update(
+                status="merged", hold_until=None
+            )
+
+    return len(groups), len(released), len(merged_ids)
+
+
+def release_digests(model, batch_size=DIGEST_BATCH_SIZE, now=None):
+    """Oynasi tugagan qabul qiluvchilarning ushlangan xabarlarini birlashtirish.
+
+    Qabul qiluvchining birinchi xabari oynani ochadi: oyna tugaganda shu
+    oraliqda unga yozilgan barcha ``pending`` xabarlar (keyinroq
+    qo'shilganlari ham) provayder chegarasi ichida birlashtiriladi.
+    Matni saqlangan qatorlarning ``hold_until`` i tozalanadi va ular
+    outbox orqali odatdagidek jo'natiladi, qolganlari ``merged`` bo'ladi.
+    Har ``batch_size`` ta qabul qiluvchi alohida qisqa tranzaksiyada.
+    """
+    now = now or timezone.now()
+    totals = {"recipients": 0, "released": 0, "merged": 0}
+    while True:
+        result = _release_batch(model, now, batch_size)
+        if result is None:
+            return totals
+        totals["recipients"] += result[0]
+        totals["released"] += result[1]
+        totals["merged"] += result[2]
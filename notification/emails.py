@@ -0,0 +1,78 @@
+from smtplib import SMTPServerDisconnected
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import EmailNotification
+
+
+def _send(connection, email):
+    message = EmailMessage(
+        subject=email.subject,
+        body=email.body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email.to_email],
+        connection=connection,
+    )
+    connection.send_messages([message])
+
+
+def deliver(emails):
+    """Xatlarni bitta SMTP ulanish (bitta TLS handshake va login) orqali jo'natish.
+
+    Har bir xat alohida yuboriladi, shuning uchun bittasidagi xato
+    qolganlariga ta'sir qilmaydi. Server ulanishni uzib qo'ysa (masalan,
+    idle timeout) bu xatning aybi emas: qayta ulanib o'sha xat bir marta
+    qayta yuboriladi. SMTP'ga ulanib bo'lmasa (boshida ham, batch o'rtasida
+    ham) jo'natilmagan xatlar ``pending`` ga qaytariladi va ``unavailable``
+    belgisi qo'yiladi. Natijalar bitta ``bulk_update`` bilan yoziladi.
+    """
+    counts = {"sent": 0, "failed": 0}
+    if not emails:
+        return counts
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Vaqtinchalik uzilish - xatlar keyingi ishga tushirishda yuboriladi
+        for email in emails:
+            email.error_message = str(e)
+        counts["unavailable"] = True
+    else:
+        try:
+            for email in emails:
+                try:
+                    try:
+                        _send(connection, email)
+                    except SMTPServerDisconnected:
+                        try:
+                            connection.close()
+                            connection.open()
+                        except Exception:
+                            # Qayta ulanib bo'lmadi - bu va qolganlari navbatga qaytadi
+                            counts["unavailable"] = True
+                            break
+                        _send(connection, email)
+                except Exception as e:
+                    email.status = "failed"
+                    email.error_message = str(e)
+                    counts["failed"] += 1
+                else:
+                    email.status = "sent"
+                    email.sent_at = timezone.now()
+                    email.error_message = ""
+                    counts["sent"] += 1
+        finally:
+            connection.close()
+
+    for email in emails:
+        if email.status not in ("sent", "failed"):
+            email.status = "pending"
+        email.lease_until = None
+
+    EmailNotification.objects.bulk_update(
+        emails, ["status", "sent_at", "error_message", "lease_until"], batch_size=1000
+    )
+    return counts
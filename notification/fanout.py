@@ -0,0 +1,124 @@
+from django.db import transaction
+from django.db.models.query import QuerySet
+
+from .digest import hold_until
+from .inbox import invalidate_unread
+from .models import EmailNotification, Notification, SMSNotification
+from .stream import publish
+
+FANOUT_CHUNK_SIZE = 1000
+
+
+def _chunks(recipients, size):
+    if isinstance(recipients, QuerySet):
+        recipients = recipients.iterator(chunk_size=size)
+    chunk = []
+    for row in recipients:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _enqueue(sms_ids, email_ids):
+    from .tasks import send_email_batch, send_sms_batch
+
+    if sms_ids:
+        send_sms_batch.delay(sms_ids)
+    if email_ids:
+        send_email_batch.delay(email_ids)
+
+
+def fan_out(
+    recipients,
+    title=None,
+    message=None,
+    sms=None,
+    email_subject=None,
+    email_body=None,
+    type="info",
+    link="",
+    context=None,
+    deliver=True,
+    digest=False,
+    chunk_size=FANOUT_CHUNK_SIZE,
+):
+    """Ko'p qabul qiluvchiga bildirishnoma, SMS va email yozish.
+
+    ``recipients`` - ``values()`` queryset yoki dict'lar ro'yxati. Har bir
+    qatorda ``user_id`` (tizim ichidagi bildirishnoma), ``phone`` (SMS) va
+    ``email`` (email) kalitlari bo'lishi mumkin - bo'sh bo'lsa o'sha kanal
+    o'tkazib yuboriladi. Shablonlar ``str.format`` orqali qator va
+    ``context`` qiymatlari bilan to'ldiriladi.
+
+    Barcha yozuvlar bitta tranzaksiyada ``bulk_create`` bilan bo'laklab
+    yoziladi, yetkazish esa commitdan keyin har bir bo'lak uchun bir marta
+    navbatga qo'yiladi. ``digest=True`` bo'lsa SMS va email darhol
+    jo'natilmaydi - digest oynasi davomida ushlanib, qabul qiluvchining
+    boshqa xabarlari bilan birlashtiriladi (``notification.digest``).
+    """
+    context = context or {}
+    held_until = hold_until() if digest else None
+    if held_until:
+        deliver = False
+    counts = {"notifications": 0, "sms": 0, "emails": 0}
+
+    with transaction.atomic():
+        for chunk in _chunks(recipients, chunk_size):
+            notifications = []
+            sms_list = []
+            emails = []
+            for row in chunk:
+                values = {**context, **row}
+                if message and values.get("user_id"):
+                    notifications.append(
+                        Notification(
+                            user_id=values["user_id"],
+                            title=title.format_map(values),
+                            message=message.format_map(values),
+                            type=type,
+                            link=link,
+                        )
+                    )
+                if sms and values.get("phone"):
+                    sms_list.append(
+                        SMSNotification(
+                            phone=values["phone"],
+                            message=sms.format_map(values),
+                            status="pending",
+                            hold_until=held_until,
+                        )
+                    )
+                if email_body and values.get("email"):
+                    emails.append(
+                        EmailNotification(
+                            to_email=values["email"],
+                            subject=email_subject.format_map(values),
+                            body=email_body.format_map(values),
+                            status="pending",
+                            hold_until=held_until,
+                        )
+                    )
+
+            Notification.objects.bulk_create(notifications)
+            invalidate_unread(n.user_id for n in notifications)
+            publish(notifications)
+            sms_list = SMSNotification.objects.bulk_create(sms_list)
+            emails = EmailNotification.objects.bulk_create(emails)
+
+            counts["notifications"] += len(notifications)
+            counts["sms"] += len(sms_list)
+            counts["emails"] += len(emails)
+
+            if deliver and (sms_list or emails):
+                sms_ids = [sms.id for sms in sms_list]
+                email_ids = [email.id for email in emails]
+                transaction.on_commit(
+                    lambda sms_ids=sms_ids, email_ids=email_ids: _enqueue(
+                        sms_ids, email_ids
+                    )
+                )
+
+    return counts
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Notification
+
+# Hisoblagich yo'qolgan invalidatsiyadan keyin ham shu vaqtda yangilanadi
+UNREAD_TIMEOUT = 24 * 60 * 60
+
+
+def _unread_key(user_id):
+    return f"notification-unread:{user_id}"
+
+
+def unread_count(user_id):
+    """O'qilmagan bildirishnomalar soni - keshdan, bo'lmasa bitta COUNT"""
+    key = _unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.set(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def invalidate_unread(user_ids):
+    """Commitdan keyin hisoblagichlarni eskirtirish.
+
+    Celery workerlaridan (``fan_out``) ham chaqiriladi, shuning uchun kesh
+    barcha jarayonlar uchun umumiy bo'lishi kerak (``settings.CACHES``).
+    """
+    keys = [_unread_key(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def mark_all_read(user_id):
+    """Foydalanuvchining barcha bildirishnomalarini bitta UPDATE bilan o'qilgan qilish"""
+    updated = Notification.objects.filter(user_id=user_id, is_read=False).update(
+        is_read=True
+    )
+    transaction.on_commit(lambda: cache.set(_unread_key(user_id), 0, UNREAD_TIMEOUT))
+    return updated
@@ -0,0 +1,46 @@
+import uuid
+
+from .fanout import FANOUT_CHUNK_SIZE, _chunks
+from .models import ReminderLedger
+
+
+def claim_reminders(kind, period, subject_ids):
+    """Ledgerga yangi (kind, subject, period) yozuvlarini qo'shish.
+
+    Faqat shu chaqiruv qo'shgan ``subject_id`` lar qaytadi - avval
+    yuborilganlar va parallel ishga tushirish olib ulgurganlari tushib
+    qoladi. Bitta INSERT va bitta SELECT.
+    """
+    subject_ids = set(subject_ids)
+    if not subject_ids:
+        return set()
+
+    run_id = uuid.uuid4()
+    ReminderLedger.objects.bulk_create(
+        [
+            ReminderLedger(
+                kind=kind, subject_id=subject_id, period=period, run_id=run_id
+            )
+            for subject_id in subject_ids
+        ],
+        ignore_conflicts=True,
+    )
+    return set(
+        ReminderLedger.objects.filter(
+            kind=kind, period=period, subject_id__in=subject_ids, run_id=run_id
+        ).values_list("subject_id", flat=True)
+    )
+
+
+def only_new(recipients, kind, period, chunk_size=FANOUT_CHUNK_SIZE):
+    """``fan_out`` uchun filtr: shu davrda hali eslatma olmagan qatorlar.
+
+    Har bir qatorda ``subject_id`` bo'lishi kerak. ``fan_out`` ichida
+    ishlatilganda ledger yozuvlari bildirishnomalar bilan bitta
+    tranzaksiyada saqlanadi.
+    """
+    for chunk in _chunks(recipients, chunk_size):
+        claimed = claim_reminders(kind, period, (row["subject_id"] for row in chunk))
+        for row in chunk:
+            if row["subject_id"] in claimed:
+                yield row
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notification", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emailnotification",
+            index=models.Index(
+                fields=["status", "created_at"], name="emails_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "is_read", "created_at"],
+                name="notifications_user_read_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="pushnotification",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["created_at"],
+                name="push_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="smsnotification",
+            index=models.Index(
+                fields=["status", "created_at"], name="sms_status_created_idx"
+            ),
+        ),
+    ]
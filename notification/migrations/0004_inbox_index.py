@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notification", "0003_outbox_lease"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="notifications_inbox_idx"
+            ),
+        ),
+    ]
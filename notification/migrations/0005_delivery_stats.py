@@ -0,0 +1,48 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notification", "0004_inbox_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeliveryStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "channel",
+                    models.CharField(
+                        choices=[
+                            ("notification", "Notification"),
+                            ("email", "Email"),
+                            ("sms", "SMS"),
+                            ("push", "Push"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("status", models.CharField(max_length=20)),
+                ("provider", models.CharField(blank=True, max_length=50)),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "notification_delivery_stats",
+                "ordering": ["-day"],
+                "unique_together": {("channel", "day", "status", "provider")},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notification", "0005_delivery_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReminderLedger",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("kind", models.CharField(max_length=50)),
+                ("subject_id", models.PositiveBigIntegerField()),
+                ("period", models.CharField(max_length=50)),
+                ("run_id", models.UUIDField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "db_table": "reminder_ledger",
+                "unique_together": {("kind", "subject_id", "period")},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notification", "0006_reminder_ledger"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailnotification",
+            name="hold_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="smsnotification",
+            name="hold_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="emailnotification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("sent", "Sent"),
+                    ("failed", "Failed"),
+                    ("merged", "Merged"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="smsnotification",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pending", "Pending"),
+                    ("processing", "Processing"),
+                    ("sent", "Sent"),
+                    ("failed", "Failed"),
+                    ("merged", "Merged"),
+                ],
+                default="pending",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="emailnotification",
+            index=models.Index(
+                fields=["status", "hold_until"], name="emails_status_hold_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="smsnotification",
+            index=models.Index(
+                fields=["status", "hold_until"], name="sms_status_hold_idx"
+            ),
+        ),
+    ]
@@ -25,6 +25,15 @@ class Notification(models.Model):
     class Meta:
         ordering = ["-created_at"]
         db_table = "notifications"
+        indexes = [
+            models.Index(
+                fields=["user", "is_read", "created_at"],
+                name="notifications_user_read_idx",
+            ),
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="notifications_inbox_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.name} - {self.title}"
@@ -35,8 +44,10 @@ class EmailNotification(models.Model):
 
     STATUS_CHOICES = [
         ("pending", "Pending"),
+        ("processing", "Processing"),
         ("sent", "Sent"),
         ("failed", "Failed"),
+        ("merged", "Merged"),
     ]
 
     to_email = models.EmailField()
@@ -46,10 +57,23 @@ class EmailNotification(models.Model):
     error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     sent_at = models.DateTimeField(null=True, blank=True)
+    # Outbox: worker qatorni lease muddatigacha egallaydi
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    lease_until = models.DateTimeField(null=True, blank=True)
+    # Digest: shu vaqtgacha boshqa xabarlar bilan birlashtirish uchun ushlanadi
+    hold_until = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
         db_table = "email_notifications"
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"], name="emails_status_created_idx"
+            ),
+            models.Index(
+                fields=["status", "hold_until"], name="emails_status_hold_idx"
+            ),
+        ]
 
 
 class SMSNotification(models.Model):
@@ -57,8 +81,10 @@ class SMSNotification(models.Model):
 
     STATUS_CHOICES = [
         ("pending", "Pending"),
+        ("processing", "Processing"),
         ("sent", "Sent"),
         ("failed", "Failed"),
+        ("merged", "Merged"),
     ]
 
     phone = models.CharField(max_length=20)
@@ -70,10 +96,21 @@ class SMSNotification(models.Model):
     error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     sent_at = models.DateTimeField(null=True, blank=True)
+    # Outbox: worker qatorni lease muddatigacha egallaydi
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    lease_until = models.DateTimeField(null=True, blank=True)
+    # Digest: shu vaqtgacha boshqa xabarlar bilan birlashtirish uchun ushlanadi
+    hold_until = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
         db_table = "sms_notifications"
+        indexes = [
+            models.Index(
+                fields=["status", "created_at"], name="sms_status_created_idx"
+            ),
+            models.Index(fields=["status", "hold_until"], name="sms_status_hold_idx"),
+        ]
 
 
 class PushNotification(models.Model):
@@ -81,6 +118,7 @@ class PushNotification(models.Model):
 
     STATUS_CHOICES = [
         ("pending", "Pending"),
+        ("processing", "Processing"),
         ("sent", "Sent"),
         ("failed", "Failed"),
     ]
@@ -90,9 +128,88 @@ class PushNotification(models.Model):
     body = models.TextField()
     data = models.JSONField(default=dict, blank=True)  # Qo'shimcha ma'lumotlar
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    error_message = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     sent_at = models.DateTimeField(null=True, blank=True)
+    # Outbox: worker qatorni lease muddatigacha egallaydi
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    lease_until = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
         db_table = "push_notifications"
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                name="push_pending_idx",
+                condition=models.Q(status="pending"),
+            ),
+        ]
+
+
+class DeviceToken(models.Model):
+    """Foydalanuvchi qurilmasining push tokeni"""
+
+    PLATFORM_CHOICES = [
+        ("android", "Android"),
+        ("ios", "iOS"),
+        ("web", "Web"),
+    ]
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="device_tokens"
+    )
+    token = models.CharField(max_length=255, unique=True)
+    platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES)
+    provider = models.CharField(max_length=50)  # notification.push.PROVIDERS kaliti
+    # Provayder tokenni yaroqsiz deb qaytarsa o'chiriladi
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        db_table = "device_tokens"
+        indexes = [
+            models.Index(fields=["user", "is_active"], name="device_tokens_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.name} - {self.platform}"
+
+
+class DeliveryStats(models.Model):
+    """Arxivlangan bildirishnomalarning kunlik yetkazish statistikasi"""
+
+    CHANNEL_CHOICES = [
+        ("notification", "Notification"),
+        ("email", "Email"),
+        ("sms", "SMS"),
+        ("push", "Push"),
+    ]
+
+    channel = models.CharField(max_length=20, choices=CHANNEL_CHOICES)
+    day = models.DateField()
+    status = models.CharField(max_length=20)  # notification uchun "read"
+    provider = models.CharField(max_length=50, blank=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day"]
+        db_table = "notification_delivery_stats"
+        unique_together = [["channel", "day", "status", "provider"]]
+
+
+class ReminderLedger(models.Model):
+    """Yuborilgan eslatmalar: (tur, obyekt, davr) bo'yicha faqat bir marta"""
+
+    kind = models.CharField(max_length=50)  # low_attendance, class_reminder, ...
+    subject_id = models.PositiveBigIntegerField()  # enrollment, debt, ... id
+    period = models.CharField(max_length=50)  # 2026-10-18, 2026-W42, ...
+    # Qaysi ishga tushirish yozganini ajratish uchun (ignore_conflicts id qaytarmaydi)
+    run_id = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "reminder_ledger"
+        unique_together = [["kind", "subject_id", "period"]]
@@ -0,0 +1,81 @@
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+LEASE_SECONDS = 5 * 60
+# Beat har 60 soniyada ishga tushiradi - navbatdagi ishga tushishdan oldin tugaydi
+DRAIN_TIME_BUDGET = 50
+
+
+def _claimable(model, now):
+    """Yangi qatorlar yoki lease muddati o'tib ketgan (worker o'lgan) qatorlar.
+
+    Digest oynasida ushlangan qatorlarni faqat ``release_digests`` bo'shatadi.
+    """
+    pending = Q(status="pending")
+    if any(field.name == "hold_until" for field in model._meta.fields):
+        pending &= Q(hold_until__isnull=True)
+    return pending | Q(status="processing", lease_until__lt=now)
+
+
+def claim(model, batch_size, ids=None, lease=LEASE_SECONDS):
+    """Outbox'dan ``batch_size`` tagacha qatorni ``processing`` holatiga o'tkazib olish.
+
+    Postgres'da nomzodlar ``SELECT ... FOR UPDATE SKIP LOCKED`` bilan
+    tanlanadi - parallel workerlar bir-birini kutmaydi va bir xil qatorni
+    olmaydi. SQLite'da qator darajasidagi lock yo'q, yozuvlar esa butun
+    baza bo'yicha ketma-ket bajariladi: shartli UPDATE compare-and-set
+    vazifasini o'taydi, boshqa worker olib ulgurgan qatorlar esa
+    ``claimed_at`` orqali ajratiladi.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        candidates = model.objects.filter(_claimable(model, now))
+        if ids is not None:
+            candidates = candidates.filter(id__in=ids)
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        candidate_ids = list(
+            candidates.order_by("created_at").values_list("id", flat=True)[:batch_size]
+        )
+        if not candidate_ids:
+            return []
+
+        model.objects.filter(_claimable(model, now), id__in=candidate_ids).update(
+            status="processing",
+            claimed_at=now,
+            lease_until=now + timedelta(seconds=lease),
+        )
+        return list(
+            model.objects.filter(
+                id__in=candidate_ids, status="processing", claimed_at=now
+            ).order_by("created_at")
+        )
+
+
+def drain(model, deliver, batch_size, time_budget=DRAIN_TIME_BUDGET):
+    """Navbat bo'shaguncha yoki vaqt tugaguncha claim -> deliver takrorlash"""
+    deadline = time.monotonic() + time_budget
+    totals = {"sent": 0, "failed": 0, "throttled": 0, "batches": 0}
+    while time.monotonic() < deadline:
+        rows = claim(model, batch_size)
+        if not rows:
+            break
+        counts = deliver(rows)
+        totals["sent"] += counts["sent"]
+        totals["failed"] += counts["failed"]
+        totals["throttled"] += counts.get("throttled", 0)
+        totals["batches"] += 1
+
+        if counts.get("unavailable"):
+            # Server javob bermayapti - qaytarilgan qatorlarni darhol qayta
+            # olib aylanmaslik uchun navbatni keyingi ishga tushirishga qoldiramiz
+            break
+        retry_after = counts.get("retry_after")
+        if retry_after:
+            # Provayder kvotasi tugadi - tokenlar to'lguncha kutamiz
+            time.sleep(min(retry_after, max(0, deadline - time.monotonic())))
+    return totals
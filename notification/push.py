@@ -0,0 +1,168 @@
+import json
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import DeviceToken, PushNotification
+
+
+class PushProvider:
+    """Push provayder interfeysi.
+
+    ``send_multicast`` bitta so'rovda bir xil payload'ni ``max_tokens``
+    tagacha tokenga yuboradi va ``{token: xato matni yoki None}``
+    qaytaradi. ``invalid_errors`` dagi xatolar token endi yaroqsizligini
+    bildiradi - bunday tokenlar o'chiriladi.
+    """
+
+    max_tokens = 500
+    invalid_errors = ()
+
+    @classmethod
+    def from_settings(cls):
+        return cls()
+
+    def send_multicast(self, tokens, title, body, data):
+        raise NotImplementedError
+
+
+class FakePushProvider(PushProvider):
+    """Tarmoqsiz provayder (lokal ishlab chiqish va testlar uchun).
+
+    Hech narsa yetkazmaydi - production'da ishlatilmasligi kerak. Oxirgi
+    ``max_calls`` ta multicast instansiyaning ``calls`` navbatida saqlanadi,
+    ``invalid`` bilan boshlanuvchi tokenlar yaroqsiz deb qaytariladi.
+    """
+
+    invalid_errors = ("UNREGISTERED",)
+    max_calls = 100
+
+    def __init__(self):
+        self.calls = deque(maxlen=self.max_calls)
+        self.lock = threading.Lock()
+
+    def send_multicast(self, tokens, title, body, data):
+        with self.lock:
+            self.calls.append(
+                {"tokens": list(tokens), "title": title, "body": body, "data": data}
+            )
+        return {
+            token: "UNREGISTERED" if token.startswith("invalid") else None
+            for token in tokens
+        }
+
+
+PROVIDERS = {
+    "fake": FakePushProvider,
+}
+
+# Har bir worker jarayonida provayder uchun bitta klient saqlanadi
+_providers = {}
+
+
+@receiver(setting_changed)
+def _reset_providers(setting, **kwargs):
+    if setting.startswith("PUSH_"):
+        _providers.clear()
+
+
+def get_provider(name):
+    if name not in _providers:
+        provider_class = PROVIDERS.get(name)
+        if provider_class is None:
+            return None
+        _providers[name] = provider_class.from_settings()
+    return _providers[name]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _payload_key(push):
+    return (push.title, push.body, json.dumps(push.data, sort_keys=True))
+
+
+def deliver(pushes):
+    """Push'larni payload bo'yicha guruhlab multicast qilish.
+
+    Bir xil (title, body, data) ga ega push'lar foydalanuvchilarining
+    barcha faol tokenlari bitta ro'yxatga yig'iladi va provayderga
+    ``max_tokens`` tadan bitta so'rovda yuboriladi. Push kamida bitta
+    qurilmaga yetib borsa ``sent`` hisoblanadi. Yaroqsiz tokenlar
+    o'chiriladi, natijalar bitta ``bulk_update`` bilan yoziladi.
+    """
+    counts = {"sent": 0, "failed": 0}
+    if not pushes:
+        return counts
+
+    tokens_by_user = defaultdict(list)
+    for user_id, token, provider in DeviceToken.objects.filter(
+        user_id__in={push.user_id for push in pushes}, is_active=True
+    ).values_list("user_id", "token", "provider"):
+        # Provayder sozlanmagan paytda ro'yxatdan o'tgan tokenlar joriy sozlamani oladi
+        tokens_by_user[user_id].append((provider or settings.PUSH_PROVIDER, token))
+
+    # (payload, provider) -> tokenlar; bitta token bir nechta push'da bo'lsa
+    # (bir foydalanuvchiga bir xil payload ikki marta) bir marta yuboriladi
+    batches = defaultdict(dict)
+    for push in pushes:
+        for provider, token in tokens_by_user[push.user_id]:
+            batches[_payload_key(push), provider].setdefault(token)
+
+    results = {}
+    invalid = []
+    for (payload, provider_name), tokens in batches.items():
+        provider = get_provider(provider_name)
+        if provider is None:
+            error = (
+                f"Unknown push provider: {provider_name}"
+                if provider_name
+                else "Push provider is not configured (PUSH_PROVIDER)"
+            )
+            results.update({(payload, token): error for token in tokens})
+            continue
+
+        title, body, data = payload
+        for chunk in _chunks(list(tokens), provider.max_tokens):
+            try:
+                errors = provider.send_multicast(chunk, title, body, json.loads(data))
+            except Exception as e:
+                errors = {token: str(e) for token in chunk}
+            results.update({(payload, token): error for token, error in errors.items()})
+            invalid.extend(
+                token
+                for token, error in errors.items()
+                if error in provider.invalid_errors
+            )
+
+    if invalid:
+        DeviceToken.objects.filter(token__in=invalid).update(is_active=False)
+
+    now = timezone.now()
+    for push in pushes:
+        tokens = [token for _, token in tokens_by_user[push.user_id]]
+        payload = _payload_key(push)
+        errors = [results.get((payload, token)) for token in tokens]
+        if not tokens:
+            push.status = "failed"
+            push.error_message = "No active device tokens"
+        elif any(error is None for error in errors):
+            push.status = "sent"
+            push.sent_at = now
+            push.error_message = ""
+        else:
+            push.status = "failed"
+            push.error_message = errors[0]
+        counts[push.status] += 1
+        push.lease_until = None
+
+    PushNotification.objects.bulk_update(
+        pushes, ["status", "sent_at", "error_message", "lease_until"], batch_size=1000
+    )
+    return counts
@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import defaultdict, deque
+
+import redis
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# Redis ishlamay qolsa shuncha soniya lokal bucket ishlatiladi
+REDIS_RETRY_SECONDS = 30
+# Jo'natish tezligi shu oynada (soniya) hisoblanadi
+RATE_WINDOW = 60
+RATE_BUCKET = 10
+
+# Bucket'ni to'ldirish va token olish atomik bajarilishi uchun Lua skript
+TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated'))
+if tokens == nil then
+  tokens = capacity
+  updated = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local granted = math.min(requested, math.floor(tokens))
+tokens = tokens - granted
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+if granted > 0 then
+  redis.call('INCRBY', KEYS[2], granted)
+  redis.call('EXPIRE', KEYS[2], ARGV[5])
+end
+return {granted, tostring(tokens)}
+"""
+
+
+def _rate_key(provider, now):
+    return f"sms-rate:{provider}:{int(now) // RATE_BUCKET}"
+
+
+class RedisBucket:
+    """Barcha workerlar uchun umumiy token bucket"""
+
+    def __init__(self, url):
+        self.client = redis.Redis.from_url(
+            url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+        self.script = self.client.register_script(TAKE_SCRIPT)
+
+    def take(self, provider, requested, rate, capacity, now):
+        granted, tokens = self.script(
+            keys=[f"sms-bucket:{provider}", _rate_key(provider, now)],
+            args=[rate, capacity, now, requested, RATE_WINDOW * 2],
+        )
+        return int(granted), float(tokens)
+
+    def sent_last_minute(self, provider, now):
+        keys = [
+            _rate_key(provider, now - step)
+            for step in range(0, RATE_WINDOW, RATE_BUCKET)
+        ]
+        return sum(int(value) for value in self.client.mget(keys) if value)
+
+
+class LocalBucket:
+    """Jarayon ichidagi token bucket - Redis ishlamaganda ishlatiladi"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.history = defaultdict(deque)
+
+    def take(self, provider, requested, rate, capacity, now):
+        with self.lock:
+            tokens, updated = self.buckets.get(provider, (capacity, now))
+            tokens = min(capacity, tokens + max(0, now - updated) * rate)
+            granted = min(requested, int(tokens))
+            self.buckets[provider] = (tokens - granted, now)
+            if granted:
+                self.history[provider].append((now, granted))
+            return granted, tokens - granted
+
+    def sent_last_minute(self, provider, now):
+        with self.lock:
+            history = self.history[provider]
+            while history and history[0][0] < now - RATE_WINDOW:
+                history.popleft()
+            return sum(count for _, count in history)
+
+
+class RateLimiter:
+    """Provayder kvotasi bo'yicha token bucket.
+
+    Holat Redis'da saqlanadi, shuning uchun barcha workerlar birgalikda
+    kvotadan oshmaydi. Redis ishlamasa ``REDIS_RETRY_SECONDS`` davomida
+    har bir jarayon o'zining lokal bucket'idan foydalanadi.
+    """
+
+    def __init__(self, limits, redis_url=None):
+        self.limits = limits
+        self.local = LocalBucket()
+        self.redis = RedisBucket(redis_url) if redis_url else None
+        self.redis_down_until = 0
+
+    def _call(self, method, *args):
+        now = time.monotonic()
+        if self.redis is not None and now >= self.redis_down_until:
+            try:
+                return getattr(self.redis, method)(*args)
+            except redis.RedisError:
+                self.redis_down_until = now + REDIS_RETRY_SECONDS
+        return getattr(self.local, method)(*args)
+
+    def acquire(self, provider, requested):
+        """``requested`` tadan nechtasini hozir jo'natish mumkin: (granted, retry_after)"""
+        limit = self.limits.get(provider)
+        if limit is None or not requested:
+            return requested, 0
+
+        granted, tokens = self._call(
+            "take", provider, requested, limit["rate"], limit["burst"], time.time()
+        )
+        retry_after = 0
+        if granted < requested:
+            wanted = min(requested - granted, limit["burst"])
+            retry_after = max(0, wanted - tokens) / limit["rate"]
+        return granted, retry_after
+
+    def stats(self, provider):
+        limit = self.limits.get(provider) or {}
+        return {
+            "rate_limit": limit.get("rate"),
+            "burst": limit.get("burst"),
+            "sent_last_minute": self._call("sent_last_minute", provider, time.time()),
+        }
+
+
+_limiter = None
+
+
+@receiver(setting_changed)
+def _reset_limiter(setting, **kwargs):
+    global _limiter
+    if setting.startswith("SMS_RATE_LIMIT"):
+        _limiter = None
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(
+            settings.SMS_RATE_LIMITS, settings.SMS_RATE_LIMIT_REDIS_URL
+        )
+    return _limiter
@@ -0,0 +1,130 @@
+import gzip
+import json
+from collections import Counter, defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (
+    DeliveryStats,
+    EmailNotification,
+    Notification,
+    PushNotification,
+    ReminderLedger,
+    SMSNotification,
+)
+
+# Har bir batch alohida qisqa tranzaksiyada o'chiriladi
+ARCHIVE_BATCH_SIZE = 1000
+# Eslatma davrlari (kun, hafta) tugagach ledger yozuvlari kerak emas
+REMINDER_LEDGER_DAYS = 60
+
+# Kanal: (model, arxivlash mumkin bo'lgan qatorlar)
+CHANNELS = {
+    "notification": (Notification, Q(is_read=True)),
+    "email": (EmailNotification, Q(status__in=["sent", "failed", "merged"])),
+    "sms": (SMSNotification, Q(status__in=["sent", "failed", "merged"])),
+    "push": (PushNotification, Q(status__in=["sent", "failed"])),
+}
+
+
+def _write_archive(archive_dir, table, rows):
+    """Qatorlarni ``<table>/<YYYY-MM>.jsonl.gz`` fayllariga qo'shish"""
+    by_month = defaultdict(list)
+    for row in rows:
+        by_month[timezone.localtime(row["created_at"]).strftime("%Y-%m")].append(row)
+
+    for month, items in by_month.items():
+        path = Path(archive_dir) / table / f"{month}.jsonl.gz"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Har bir batch alohida gzip member bo'lib qo'shiladi - gzip.open
+        # ularni bitta oqim sifatida o'qiydi
+        with gzip.open(path, "at", encoding="utf-8") as archive:
+            for row in items:
+                archive.write(json.dumps(row, cls=DjangoJSONEncoder) + "\n")
+
+
+def _add_stats(channel, stats):
+    for (day, status, provider), count in stats.items():
+        updated = DeliveryStats.objects.filter(
+            channel=channel, day=day, status=status, provider=provider
+        ).update(count=F("count") + count)
+        if not updated:
+            DeliveryStats.objects.create(
+                channel=channel, day=day, status=status, provider=provider, count=count
+            )
+
+
+def archive_channel(channel, days, batch_size=ARCHIVE_BATCH_SIZE, archive_dir=None):
+    """Bitta kanalning eski qatorlarini arxivlab o'chirish.
+
+    Qatorlar id bo'yicha keyset bilan ``batch_size`` tadan o'qiladi: avval
+    arxiv fayliga yoziladi, so'ng kunlik statistika va o'chirish bitta qisqa
+    tranzaksiyada bajariladi, shuning uchun jadval uzoq lock qilinmaydi.
+    Fayl yozilgandan keyin jarayon to'xtasa qatorlar keyingi safar yana
+    arxivga tushadi (at-least-once).
+    """
+    model, archivable = CHANNELS[channel]
+    archive_dir = archive_dir or settings.NOTIFICATION_ARCHIVE_DIR
+    cutoff = timezone.now() - timedelta(days=days)
+    totals = {"archived": 0, "batches": 0}
+
+    last_id = 0
+    while True:
+        rows = list(
+            model.objects.filter(archivable, created_at__lt=cutoff, id__gt=last_id)
+            .order_by("id")
+            .values()[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        _write_archive(archive_dir, model._meta.db_table, rows)
+        stats = Counter(
+            (
+                timezone.localtime(row["created_at"]).date(),
+                row.get("status", "read"),
+                row.get("provider", ""),
+            )
+            for row in rows
+        )
+        with transaction.atomic():
+            _add_stats(channel, stats)
+            model.objects.filter(id__in=[row["id"] for row in rows]).delete()
+
+        totals["archived"] += len(rows)
+        totals["batches"] += 1
+    return totals
+
+
+def archive_notifications(
+    retention=None, batch_size=ARCHIVE_BATCH_SIZE, archive_dir=None
+):
+    """Barcha kanallar bo'yicha retention: {kanal: {"archived", "batches"}}"""
+    retention = retention or settings.NOTIFICATION_RETENTION_DAYS
+    return {
+        channel: archive_channel(channel, days, batch_size, archive_dir)
+        for channel, days in retention.items()
+    }
+
+
+def purge_reminder_ledger(days=REMINDER_LEDGER_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """Eski ledger yozuvlarini bo'laklab o'chirish"""
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    while True:
+        ids = list(
+            ReminderLedger.objects.filter(created_at__lt=cutoff)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        deleted += ReminderLedger.objects.filter(id__in=ids).delete()[0]
+    return deleted
@@ -1,5 +1,13 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Notification, EmailNotification, SMSNotification, PushNotification
+from .models import (
+    DeviceToken,
+    Notification,
+    EmailNotification,
+    SMSNotification,
+    PushNotification,
+)
+from .push import PROVIDERS
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -8,6 +16,13 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class InboxNotificationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Notification
+        fields = ["id", "title", "message", "type", "link", "is_read", "created_at"]
+        read_only_fields = fields
+
+
 class EmailNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = EmailNotification
@@ -24,3 +39,26 @@ class PushNotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = PushNotification
         fields = "__all__"
+
+
+class DeviceTokenSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DeviceToken
+        fields = ["id", "token", "platform", "provider", "is_active", "created_at"]
+        read_only_fields = ["is_active", "created_at"]
+        # Token boshqa foydalanuvchidan o'tishi mumkin - create() da upsert qilinadi
+        extra_kwargs = {"token": {"validators": []}, "provider": {"required": False}}
+
+    def validate_provider(self, value):
+        if value not in PROVIDERS:
+            raise serializers.ValidationError(f"Unknown push provider: {value}")
+        return value
+
+    def create(self, validated_data):
+        """Bir xil token qayta ro'yxatdan o'tsa yangi egasiga o'tkaziladi"""
+        validated_data.setdefault("provider", settings.PUSH_PROVIDER)
+        instance, _ = DeviceToken.objects.update_or_create(
+            token=validated_data.pop("token"),
+            defaults={**validated_data, "is_active": True},
+        )
+        return instance
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .inbox import invalidate_unread
+from .models import Notification
+from .stream import publish
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def reset_unread_count(sender, instance, **kwargs):
+    invalidate_unread([instance.user_id])
+
+
+@receiver(post_save, sender=Notification)
+def publish_to_stream(sender, instance, created, **kwargs):
+    if created:
+        publish([instance])
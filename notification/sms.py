@@ -0,0 +1,178 @@
+from collections import defaultdict
+
+import requests
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .models import SMSNotification
+from .ratelimit import get_limiter
+
+
+def _normalize_phone(phone):
+    """Eskiz raqamni faqat raqamlar ko'rinishida kutadi: 998901234567"""
+    return "".join(ch for ch in phone if ch.isdigit())
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class EskizClient:
+    """Eskiz.uz uchun uzoq yashovchi (pool'langan) HTTP sessiya"""
+
+    supports_batch = True
+
+    def __init__(self, base_url, token, sender, timeout, batch_size):
+        self.base_url = base_url.rstrip("/")
+        self.sender = sender
+        self.timeout = timeout
+        self.batch_size = batch_size
+
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        # Faqat ulanish xatolarida qayta urinamiz - POST qayta yuborilsa
+        # xabar ikki marta ketishi mumkin
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, read=0, status=0, backoff_factor=0.2),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            base_url=settings.ESKIZ_API_URL,
+            token=settings.ESKIZ_API_TOKEN,
+            sender=settings.ESKIZ_SENDER,
+            timeout=settings.SMS_HTTP_TIMEOUT,
+            batch_size=settings.SMS_BATCH_SIZE,
+        )
+
+    def send(self, sms):
+        """Bitta SMS. Xato bo'lsa matnini, aks holda None qaytaradi"""
+        response = self.session.post(
+            f"{self.base_url}/message/sms/send",
+            data={
+                "mobile_phone": _normalize_phone(sms.phone),
+                "message": sms.message,
+                "from": self.sender,
+            },
+            timeout=self.timeout,
+        )
+        return None if response.status_code == 200 else response.text
+
+    def send_batch(self, sms_list):
+        """Bir so'rovda ko'p SMS: {sms_id: xato matni yoki None}"""
+        response = self.session.post(
+            f"{self.base_url}/message/sms/send-batch",
+            json={
+                "messages": [
+                    {
+                        "user_sms_id": str(sms.id),
+                        "to": _normalize_phone(sms.phone),
+                        "text": sms.message,
+                    }
+                    for sms in sms_list
+                ],
+                "from": self.sender,
+                "dispatch_id": sms_list[0].id,
+            },
+            timeout=self.timeout,
+        )
+        error = None if response.status_code == 200 else response.text
+        return {sms.id: error for sms in sms_list}
+
+
+PROVIDERS = {
+    "eskiz": EskizClient,
+}
+# Klienti yo'q provayderlar (masalan, playmobile) avvalgidek Eskiz orqali
+# jo'natiladi va uning kvotasidan foydalanadi
+DEFAULT_PROVIDER = "eskiz"
+
+# Har bir worker jarayonida provayder uchun bitta sessiya saqlanadi
+_clients = {}
+
+
+@receiver(setting_changed)
+def _reset_clients(setting, **kwargs):
+    if setting.startswith(("ESKIZ_", "SMS_")):
+        _clients.clear()
+
+
+def resolve_provider(name):
+    return name if name in PROVIDERS else DEFAULT_PROVIDER
+
+
+def get_client(provider):
+    if provider not in _clients:
+        client_class = PROVIDERS.get(provider)
+        if client_class is None:
+            return None
+        _clients[provider] = client_class.from_settings()
+    return _clients[provider]
+
+
+def deliver(sms_list):
+    """SMS'larni provayder bo'yicha guruhlab jo'natish.
+
+    Batch endpointi bor provayderlarga ``SMS_BATCH_SIZE`` tadan bitta
+    so'rovda yuboriladi. Provayder kvotasidan oshgan xabarlar ``failed``
+    qilinmaydi - navbatga (``pending``) qaytariladi, ``retry_after`` esa
+    tokenlar qachon yetarli bo'lishini bildiradi. Holat, ``sent_at`` va
+    xato matni barcha qatorlar uchun bitta ``bulk_update`` bilan yoziladi,
+    lease bo'shatiladi.
+    """
+    by_provider = defaultdict(list)
+    for sms in sms_list:
+        by_provider[resolve_provider(sms.provider)].append(sms)
+
+    errors = {}
+    throttled = set()
+    retry_after = 0
+    for provider, items in by_provider.items():
+        client = get_client(provider)
+        granted, wait = get_limiter().acquire(provider, len(items))
+        if granted < len(items):
+            throttled.update(sms.id for sms in items[granted:])
+            retry_after = max(retry_after, wait)
+            items = items[:granted]
+
+        for chunk in _chunks(items, client.batch_size):
+            try:
+                if client.supports_batch:
+                    errors.update(client.send_batch(chunk))
+                else:
+                    errors.update({sms.id: client.send(sms) for sms in chunk})
+            except requests.RequestException as e:
+                errors.update({sms.id: str(e) for sms in chunk})
+
+    now = timezone.now()
+    counts = {"sent": 0, "failed": 0, "throttled": 0, "retry_after": retry_after}
+    for sms in sms_list:
+        error = errors.get(sms.id)
+        if sms.id in throttled:
+            sms.status = "pending"
+            counts["throttled"] += 1
+        elif error is None:
+            sms.status = "sent"
+            sms.sent_at = now
+            sms.error_message = ""
+            counts["sent"] += 1
+        else:
+            sms.status = "failed"
+            sms.error_message = error
+            counts["failed"] += 1
+        sms.lease_until = None
+
+    SMSNotification.objects.bulk_update(
+        sms_list, ["status", "sent_at", "error_message", "lease_until"], batch_size=1000
+    )
+    return counts
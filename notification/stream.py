@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+import redis
+import redis.asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+
+from .models import Notification
+from .serializers import InboxNotificationSerializer
+
+logger = logging.getLogger(__name__)
+
+STREAM_HEARTBEAT = 15
+# Uzilgan klientlar obunasi osilib qolmasligi uchun stream shu vaqtdan keyin
+# yopiladi - EventSource Last-Event-ID bilan avtomatik qayta ulanadi
+STREAM_MAX_AGE = 5 * 60
+STREAM_RETRY_MS = 3000
+STREAM_BACKLOG = 100
+
+
+def _channel(user_id):
+    return f"notifications:{user_id}"
+
+
+class InMemoryBroker:
+    """Bitta jarayon ichidagi pub/sub (bitta ASGI worker yoki testlar uchun).
+
+    Xabarlar istalgan thread'dan (sinxron view, signal) e'lon qilinadi va
+    obunachining event loop'iga ``call_soon_threadsafe`` orqali uzatiladi.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)
+
+    def publish_many(self, messages):
+        with self.lock:
+            targets = [
+                (subscriber, message)
+                for channel, message in messages
+                for subscriber in self.subscribers.get(channel, ())
+            ]
+        for (loop, queue), message in targets:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                # Obunachining loop'i yopilgan - unsubscribe hali ulgurmagan
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        queue = asyncio.Queue()
+        subscriber = (asyncio.get_running_loop(), queue)
+        with self.lock:
+            self.subscribers[channel].add(subscriber)
+        try:
+            yield _QueueSubscription(queue)
+        finally:
+            with self.lock:
+                self.subscribers[channel].discard(subscriber)
+                if not self.subscribers[channel]:
+                    del self.subscribers[channel]
+
+
+class _QueueSubscription:
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class RedisBroker:
+    """Redis pub/sub - bir nechta ASGI worker va Celery workerlar orasida"""
+
+    def __init__(self, url):
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+
+    def publish_many(self, messages):
+        pipe = self.client.pipeline(transaction=False)
+        for channel, message in messages:
+            pipe.publish(channel, message)
+        pipe.execute()
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        client = redis.asyncio.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            yield _RedisSubscription(pubsub)
+        finally:
+            await pubsub.unsubscribe(channel)
+            await pubsub.close()
+            await client.close()
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        if message is None:
+            return None
+        return message["data"].decode()
+
+
+_broker = None
+
+
+@receiver(setting_changed)
+def _reset_broker(setting, **kwargs):
+    global _broker
+    if setting == "NOTIFICATION_STREAM_REDIS_URL":
+        _broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        url = settings.NOTIFICATION_STREAM_REDIS_URL
+        _broker = RedisBroker(url) if url else InMemoryBroker()
+    return _broker
+
+
+def publish(notifications):
+    """Yangi bildirishnomalarni commitdan keyin egalarining kanaliga e'lon qilish"""
+    messages = [
+        (
+            _channel(notification.user_id),
+            json.dumps(InboxNotificationSerializer(notification).data),
+        )
+        for notification in notifications
+        if notification.user_id
+    ]
+    if not messages:
+        return
+
+    def send():
+        try:
+            get_broker().publish_many(messages)
+        except redis.RedisError:
+            # Stream ixtiyoriy kanal - klient qayta ulanganda bazadan oladi
+            logger.exception("Notification stream publish failed")
+
+    transaction.on_commit(send)
+
+
+def _missed(user_id, last_id):
+    notifications = Notification.objects.filter(
+        user_id=user_id, id__gt=last_id
+    ).order_by("id")[:STREAM_BACKLOG]
+    return [
+        json.dumps(InboxNotificationSerializer(notification).data)
+        for notification in notifications
+    ]
+
+
+def _event(notification_id, message):
+    return f"id: {notification_id}\nevent: notification\ndata: {message}\n\n"
+
+
+async def event_stream(user_id, last_id=None):
+    """SSE hodisalari: qayta ulanishda o'tkazib yuborilganlar, keyin jonli oqim"""
+    loop = asyncio.get_running_loop()
+    async with get_broker().subscribe(_channel(user_id)) as subscription:
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+
+        # Obunadan keyin, lekin catch-up so'rovidan oldin kelganlar ikki
+        # marta yuborilmasligi uchun
+        replayed = set()
+        if last_id is not None:
+            for message in await sync_to_async(_missed)(user_id, last_id):
+                notification_id = json.loads(message)["id"]
+                replayed.add(notification_id)
+                yield _event(notification_id, message)
+
+        deadline = loop.time() + STREAM_MAX_AGE
+        while loop.time() < deadline:
+            message = await subscription.get(STREAM_HEARTBEAT)
+            if message is None:
+                yield ": ping\n\n"
+                continue
+            notification_id = json.loads(message)["id"]
+            if notification_id not in replayed:
+                yield _event(notification_id, message)
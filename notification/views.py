@@ -1,16 +1,31 @@
-from rest_framework import viewsets
+from asgiref.sync import sync_to_async
+from django.db.models import Count
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 from notification.models import (
+    DeviceToken,
     Notification,
     EmailNotification,
     SMSNotification,
     PushNotification,
 )
+from notification import inbox, stream
+from notification.ratelimit import get_limiter
 from notification.serializers import (
+    DeviceTokenSerializer,
+    InboxNotificationSerializer,
     NotificationSerializer,
     EmailNotificationSerializer,
     SMSNotificationSerializer,
     PushNotificationSerializer,
 )
+from notification.sms import PROVIDERS
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -18,6 +33,41 @@ class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
 
 
+class InboxCursorPagination(CursorPagination):
+    page_size = 20
+    ordering = ("-created_at", "-id")
+
+
+class InboxViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+    """Joriy foydalanuvchining bildirishnomalari (keyset pagination)"""
+
+    queryset = Notification.objects.all()
+    serializer_class = InboxNotificationSerializer
+    pagination_class = InboxCursorPagination
+    # Tartib cursor pagination'da qat'iy - OrderingFilter ishlatilmaydi
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["is_read", "type"]
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+    @action(detail=False, methods=["get"])
+    def unread_count(self, request):
+        return Response({"unread": inbox.unread_count(request.user.id)})
+
+    @action(detail=False, methods=["post"])
+    def mark_all_read(self, request):
+        updated = inbox.mark_all_read(request.user.id)
+        return Response({"updated": updated, "unread": 0})
+
+    @action(detail=True, methods=["post"])
+    def read(self, request, pk=None):
+        updated = self.get_queryset().filter(pk=pk, is_read=False).update(is_read=True)
+        if updated:
+            inbox.invalidate_unread([request.user.id])
+        return Response({"updated": updated})
+
+
 class EmailNotificationViewSet(viewsets.ModelViewSet):
     queryset = EmailNotification.objects.all()
     serializer_class = EmailNotificationSerializer
@@ -27,7 +77,84 @@ class SMSNotificationViewSet(viewsets.ModelViewSet):
     queryset = SMSNotification.objects.all()
     serializer_class = SMSNotificationSerializer
 
+    @action(detail=False, methods=["get"])
+    def providers(self, request):
+        """Provayderlar bo'yicha kvota, jo'natish tezligi va navbat"""
+        backlog = dict(
+            SMSNotification.objects.filter(status__in=["pending", "processing"])
+            .order_by()
+            .values_list("provider")
+            .annotate(count=Count("id"))
+        )
+        limiter = get_limiter()
+        names = sorted(set(PROVIDERS) | set(limiter.limits) | set(backlog))
+        return Response(
+            [
+                {
+                    "provider": name,
+                    "backlog": backlog.get(name, 0),
+                    **limiter.stats(name),
+                }
+                for name in names
+            ]
+        )
+
 
 class PushNotificationViewSet(viewsets.ModelViewSet):
     queryset = PushNotification.objects.all()
     serializer_class = PushNotificationSerializer
+
+
+class DeviceTokenViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Joriy foydalanuvchining push qurilmalari"""
+
+    queryset = DeviceToken.objects.all()
+    serializer_class = DeviceTokenSerializer
+    filterset_fields = ["platform", "is_active"]
+
+    def get_queryset(self):
+        return self.queryset.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+def _stream_user(request):
+    """EventSource sarlavha yubora olmaydi - token ``?token=`` orqali ham qabul qilinadi"""
+    auth = JWTAuthentication()
+    try:
+        token = request.GET.get("token")
+        if token:
+            return auth.get_user(auth.get_validated_token(token))
+        result = auth.authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+async def notification_stream(request):
+    """Server-Sent Events: joriy foydalanuvchining yangi bildirishnomalari"""
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    user = await sync_to_async(_stream_user)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+
+    last_id = request.headers.get("Last-Event-ID") or request.GET.get("last_id")
+    response = StreamingHttpResponse(
+        stream.event_stream(
+            user.id, int(last_id) if last_id and last_id.isdigit() else None
+        ),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
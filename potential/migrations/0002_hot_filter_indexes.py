@@ -0,0 +1,20 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("potential", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="lead",
+            index=models.Index(
+                fields=["center", "status", "created_at"],
+                name="leads_center_status_idx",
+            ),
+        ),
+    ]
@@ -36,6 +36,12 @@ class Lead(models.Model):
         verbose_name = _("Lead")
         verbose_name_plural = _("Leads")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["center", "status", "created_at"],
+                name="leads_center_status_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.status}"
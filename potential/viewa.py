@@ -9,7 +9,7 @@ from akademk.ruxsatnomalar import IsManager
 
 
 class LeadViewSet(viewsets.ModelViewSet):
-    queryset = Lead.objects.all()
+    queryset = Lead.objects.select_related("center", "assigned_to")
     serializer_class = LeadSerializer
     permission_classes = [IsAuthenticated, IsManager]
     filterset_fields = ["center", "status", "source", "assigned_to"]
@@ -18,8 +18,8 @@ class LeadViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Lead.objects.all()
-        return Lead.objects.filter(center=user.center)
+            return self.queryset.all()
+        return self.queryset.filter(center=user.center)
 
     def perform_create(self, serializer):
         if self.request.user.role != "superadmin":
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class YadroConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "yadro"
+
+    def ready(self):
+        import yadro.signals  # CenterStats snapshotini yangilovchi signallar
@@ -0,0 +1,84 @@
+import csv
+import io
+import re
+from datetime import datetime
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.utils import OpenApiTypes, extend_schema
+from rest_framework.decorators import action
+
+EXPORT_CHUNK_SIZE = 2000
+# Excel bu belgilar bilan boshlangan katakni formula sifatida bajaradi
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+# Telefon raqamlari va manfiy sonlar formula emas - ular o'zgarishsiz qoladi
+NUMERIC_RE = re.compile(r"[+-]?\d[\d\s().-]*")
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).strftime("%Y-%m-%d %H:%M:%S")
+    if (
+        isinstance(value, str)
+        and value.startswith(FORMULA_PREFIXES)
+        and not NUMERIC_RE.fullmatch(value)
+    ):
+        # CSV injection: foydalanuvchi matni matn bo'lib qolishi uchun
+        return f"'{value}"
+    return value
+
+
+def stream_csv(header, rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """CSV qatorlarini ``chunk_size`` tadan bo'laklab yield qilish.
+
+    Bufer har bo'lakdan keyin tozalanadi - xotira eksport hajmiga bog'liq emas.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Excel UTF-8 ni BOM bo'lmasa noto'g'ri o'qiydi
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    for number, row in enumerate(rows, 1):
+        writer.writerow([_cell(value) for value in row])
+        if number % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+class CSVExportMixin:
+    """ViewSet'ga ``GET .../export/`` - filtrlangan ro'yxatni CSV qilib oqimlash.
+
+    ``get_queryset`` (markaz/rol bo'yicha cheklov) va ``filter_queryset``
+    (``filterset_fields``, qidiruv, tartib) ro'yxat bilan bir xil
+    ishlatiladi, pagination esa qo'llanmaydi. Qatorlar
+    ``values_list(...).iterator()`` orqali modelsiz o'qiladi.
+    """
+
+    export_fields = []  # [(sarlavha, maydon yo'li), ...]
+    export_filename = "export"
+
+    @extend_schema(
+        summary="Export as CSV",
+        description="Ro'yxat filtrlari bilan barcha qatorlarni CSV faylga yuklab olish",
+        responses={(200, "text/csv"): OpenApiTypes.BINARY},
+    )
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        header = [title for title, _ in self.export_fields]
+        lookups = [lookup for _, lookup in self.export_fields]
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .values_list(*lookups)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+
+        response = StreamingHttpResponse(
+            stream_csv(header, rows), content_type="text/csv; charset=utf-8"
+        )
+        filename = f"{self.export_filename}-{timezone.localdate():%Y-%m-%d}.csv"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("yadro", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CenterStats",
+            fields=[
+                (
+                    "center",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="yadro.center",
+                    ),
+                ),
+                ("total_users", models.IntegerField(default=0)),
+                ("total_students", models.IntegerField(default=0)),
+                ("total_groups", models.IntegerField(default=0)),
+                ("active_groups", models.IntegerField(default=0)),
+                (
+                    "total_revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("branches_count", models.IntegerField(default=0)),
+                ("reconciled_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Center Stats",
+                "verbose_name_plural": "Center Stats",
+                "db_table": "center_stats",
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.27 on 2026-10-18 07:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("yadro", "0002_centerstats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activitylog",
+            index=models.Index(
+                fields=["target_table", "target_id"], name="activity_logs_target_idx"
+            ),
+        ),
+    ]
@@ -76,6 +76,32 @@ class ActivityLog(models.Model):
         verbose_name = _('Activity Log')
         verbose_name_plural = _('Activity Logs')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['target_table', 'target_id'], name='activity_logs_target_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.user} - {self.action}"
\ No newline at end of file
+        return f"{self.user} - {self.action}"
+
+class CenterStats(models.Model):
+    """Markaz ko'rsatkichlari snapshoti (signallar orqali yangilanadi)"""
+
+    center = models.OneToOneField(
+        Center, on_delete=models.CASCADE, primary_key=True, related_name='stats'
+    )
+    total_users = models.IntegerField(default=0)
+    total_students = models.IntegerField(default=0)
+    total_groups = models.IntegerField(default=0)
+    active_groups = models.IntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    branches_count = models.IntegerField(default=0)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'center_stats'
+        verbose_name = _('Center Stats')
+        verbose_name_plural = _('Center Stats')
+
+    def __str__(self):
+        return f"{self.center_id} - stats"
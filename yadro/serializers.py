@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Center, Branch, Room, ActivityLog
+from .models import Center, CenterStats, Branch, Room, ActivityLog
 
 
 class CenterSerializer(serializers.ModelSerializer):
@@ -9,6 +9,15 @@ class CenterSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class CenterStatsSerializer(serializers.ModelSerializer):
+    total_revenue = serializers.DecimalField(max_digits=14, decimal_places=2, coerce_to_string=False)
+
+    class Meta:
+        model = CenterStats
+        fields = ['total_users', 'total_students', 'total_groups', 'active_groups', 'total_revenue',
+                  'branches_count', 'updated_at']
+
+
 class BranchSerializer(serializers.ModelSerializer):
     center_name = serializers.CharField(source='center.name', read_only=True)
 
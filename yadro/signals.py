@@ -0,0 +1,40 @@
+from decimal import Decimal
+
+from akademk.models import Group, Student
+from hisoblar.models import User
+from moliya.models import Payment
+from .models import Branch
+from .snapshots import track
+from .stats import apply_delta
+
+# Har bir model snapshotga qanday hissa qo'shishi: (kuzatiladigan maydonlar, hissa)
+TRACKED = {
+    User: (["center_id"], lambda obj: {"total_users": 1}),
+    Student: (["center_id"], lambda obj: {"total_students": 1}),
+    Branch: (["center_id"], lambda obj: {"branches_count": 1}),
+    Group: (
+        ["center_id", "status"],
+        lambda obj: {
+            "total_groups": 1,
+            "active_groups": 1 if obj.status == "active" else 0,
+        },
+    ),
+    Payment: (
+        ["center_id", "status", "amount"],
+        lambda obj: {
+            "total_revenue": (
+                Decimal(str(obj.amount)) if obj.status == "paid" else Decimal(0)
+            )
+        },
+    ),
+}
+
+
+for model, (fields, contribute) in TRACKED.items():
+    track(
+        model,
+        "stats",
+        fields,
+        lambda obj, contribute=contribute: (obj.center_id, contribute(obj)),
+        apply_delta,
+    )
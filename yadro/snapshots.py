@@ -0,0 +1,60 @@
+"""Snapshot jadvallar (CenterStats, StudentBalance, RevenueDaily) uchun
+qatorlar hissasini signal orqali kuzatish"""
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+
+def track(model, name, fields, contribute, apply_delta):
+    """``model`` qatorlarining snapshot jadvalga hissasini kuzatish.
+
+    ``contribute(obj)`` -> (kalit, {maydon: qiymat}). Saqlanganda eski va
+    yangi hissa farqi (kalit o'zgarsa - eskisidan ayirib yangisiga
+    qo'shib), o'chirilganda esa hissaning o'zi ``apply_delta(kalit, ...)``
+    orqali F() delta sifatida yoziladi.
+    """
+    attr = f"_{name}_contribution"
+
+    def remember(sender, instance, **kwargs):
+        # Deferred maydonlarga tegmaymiz, aks holda har bir qator uchun so'rov ketadi
+        if instance.pk is None or any(f not in instance.__dict__ for f in fields):
+            setattr(instance, attr, None)
+        else:
+            setattr(instance, attr, contribute(instance))
+
+    def load(sender, instance, **kwargs):
+        if instance._state.adding or getattr(instance, attr, None):
+            return
+        old = sender.objects.filter(pk=instance.pk).only(*fields).first()
+        setattr(instance, attr, contribute(old) if old else None)
+
+    def apply(sender, instance, created=False, **kwargs):
+        old = None if created else getattr(instance, attr, None)
+        key, new = contribute(instance)
+
+        if old is None:
+            apply_delta(key, **new)
+        elif old[0] == key:
+            apply_delta(key, **{f: new[f] - old[1][f] for f in new})
+        else:
+            apply_delta(old[0], **{f: -v for f, v in old[1].items()})
+            apply_delta(key, **new)
+
+        setattr(instance, attr, (key, new))
+
+    def revoke(sender, instance, **kwargs):
+        key, values = getattr(instance, attr, None) or contribute(instance)
+        apply_delta(key, **{f: -v for f, v in values.items()})
+
+    # Receiver'lar closure - weak=False bo'lmasa garbage collector o'chiradi
+    for suffix, signal, handler in [
+        ("init", post_init, remember),
+        ("pre-save", pre_save, load),
+        ("save", post_save, apply),
+        ("delete", post_delete, revoke),
+    ]:
+        signal.connect(
+            handler,
+            sender=model,
+            weak=False,
+            dispatch_uid=f"{name}-{model._meta.label}-{suffix}",
+        )
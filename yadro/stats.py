@@ -0,0 +1,58 @@
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Branch, CenterStats
+
+STAT_FIELDS = [
+    "total_users",
+    "total_students",
+    "total_groups",
+    "active_groups",
+    "total_revenue",
+    "branches_count",
+]
+
+
+def live_counts(center_id):
+    """Ko'rsatkichlarni bevosita jadvallardan sanash"""
+    from akademk.models import Group, Student
+    from hisoblar.models import User
+    from moliya.models import Payment
+
+    return {
+        "total_users": User.objects.filter(center_id=center_id).count(),
+        "total_students": Student.objects.filter(center_id=center_id).count(),
+        "total_groups": Group.objects.filter(center_id=center_id).count(),
+        "active_groups": Group.objects.filter(
+            center_id=center_id, status="active"
+        ).count(),
+        "total_revenue": Payment.objects.filter(
+            center_id=center_id, status="paid"
+        ).aggregate(total=Sum("amount"))["total"]
+        or 0,
+        "branches_count": Branch.objects.filter(center_id=center_id).count(),
+    }
+
+
+def recount(center_id):
+    """Snapshotni noldan qayta hisoblash"""
+    stats, _ = CenterStats.objects.update_or_create(
+        center_id=center_id,
+        defaults={**live_counts(center_id), "reconciled_at": timezone.now()},
+    )
+    return stats
+
+
+def apply_delta(center_id, **deltas):
+    """Snapshotga atomik F() delta qo'shish.
+
+    Snapshot hali yaratilmagan bo'lsa hech narsa qilinmaydi - birinchi
+    o'qishda yoki tungi reconcile paytida to'liq hisoblanadi.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if center_id is None or not deltas:
+        return
+    CenterStats.objects.filter(center_id=center_id).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + value for field, value in deltas.items()},
+    )
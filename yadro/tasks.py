@@ -0,0 +1,14 @@
+from celery import shared_task
+
+from .models import Center
+from .stats import recount
+
+
+# ----------------- Center stats reconcile -----------------
+@shared_task
+def reconcile_center_stats():
+    count = 0
+    for center_id in Center.objects.values_list("id", flat=True).iterator():
+        recount(center_id)
+        count += 1
+    return f"Reconciled stats for {count} centers"
@@ -2,18 +2,16 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Sum
-from .models import Center, Branch, Room, ActivityLog
+from .models import Center, CenterStats, Branch, Room, ActivityLog
 from .serializers import (
     CenterSerializer,
+    CenterStatsSerializer,
     BranchSerializer,
     RoomSerializer,
     ActivityLogSerializer,
 )
-from akademk.models import Student, Group
+from .stats import recount
 from akademk.ruxsatnomalar import IsSuperAdmin, IsDirector
-from hisoblar.models import User
-from moliya.models import Payment
 
 
 class CenterViewSet(viewsets.ModelViewSet):
@@ -25,27 +23,19 @@ class CenterViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=["get"])
     def analytics(self, request, pk=None):
-        center = self.get_object()
+        stats = None
+        if request.query_params.get("fresh") not in ("1", "true"):
+            stats = CenterStats.objects.filter(pk=pk).first()
+        if stats is None:
+            # Snapshot yo'q yoki ?fresh=1 - jonli hisoblab snapshotni yangilaymiz
+            stats = recount(self.get_object().id)
 
-        data = {
-            "total_users": User.objects.filter(center=center).count(),
-            "total_students": Student.objects.filter(user__center=center).count(),
-            "total_groups": Group.objects.filter(center=center).count(),
-            "active_groups": Group.objects.filter(
-                center=center, status="active"
-            ).count(),
-            "total_revenue": Payment.objects.filter(
-                center=center, status="paid"
-            ).aggregate(total=Sum("amount"))["total"]
-            or 0,
-            "branches_count": Branch.objects.filter(center=center).count(),
-        }
-
-        return Response(data)
+        serializer = CenterStatsSerializer(stats)
+        return Response(serializer.data)
 
 
 class BranchViewSet(viewsets.ModelViewSet):
-    queryset = Branch.objects.all()
+    queryset = Branch.objects.select_related("center")
     serializer_class = BranchSerializer
     permission_classes = [IsAuthenticated, IsDirector]
     filterset_fields = ["center"]
@@ -54,8 +44,8 @@ class BranchViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Branch.objects.all()
-        return Branch.objects.filter(center=user.center)
+            return self.queryset.all()
+        return self.queryset.filter(center=user.center)
 
     def perform_create(self, serializer):
         if self.request.user.role != "superadmin":
@@ -65,7 +55,7 @@ class BranchViewSet(viewsets.ModelViewSet):
 
 
 class RoomViewSet(viewsets.ModelViewSet):
-    queryset = Room.objects.all()
+    queryset = Room.objects.select_related("branch")
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticated, IsDirector]
     filterset_fields = ["center", "branch"]
@@ -74,8 +64,8 @@ class RoomViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return Room.objects.all()
-        return Room.objects.filter(center=user.center)
+            return self.queryset.all()
+        return self.queryset.filter(center=user.center)
 
     def perform_create(self, serializer):
         if self.request.user.role != "superadmin":
@@ -85,7 +75,7 @@ class RoomViewSet(viewsets.ModelViewSet):
 
 
 class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = ActivityLog.objects.all()
+    queryset = ActivityLog.objects.select_related("user")
     serializer_class = ActivityLogSerializer
     permission_classes = [IsAuthenticated, IsDirector]
     filterset_fields = ["user", "action", "target_table"]
@@ -94,5 +84,5 @@ class ActivityLogViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         user = self.request.user
         if user.role == "superadmin":
-            return ActivityLog.objects.all()
-        return ActivityLog.objects.filter(user__center=user.center)
+            return self.queryset.all()
+        return self.queryset.filter(user__center=user.center)